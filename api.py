@@ -2,19 +2,51 @@
 FastAPI Backend Server
 Provides REST API for the drug repurposing dashboard
 """
-from fastapi import FastAPI, HTTPException
+import asyncio
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uvicorn
 from agents.master_agent import MasterAgent
-from config import APP_HOST, APP_PORT, DEBUG
+from config import (
+    APP_HOST, APP_PORT, DEBUG,
+    HOT_RELOAD_ENABLED, HOT_RELOAD_INTERVAL, ANALYSIS_CACHE_SIZE,
+    REQUEST_LOG_ENABLED, REQUEST_LOG_PATH, REQUEST_LOG_SAMPLE_RATE, REQUEST_LOG_MAX_BYTES,
+    REQUEST_LOG_BACKUP_COUNT, REQUEST_LOG_MAX_BODY_BYTES, REQUEST_LOG_QUEUE_SIZE,
+    PROFILING_ENABLED, PROFILING_TOKEN, PROFILING_MAX_PER_MINUTE, PROFILING_SAMPLE_INTERVAL_MS,
+    HOTSPOT_SAMPLER_ENABLED, HOTSPOT_SAMPLE_INTERVAL_MS, HOTSPOT_MAX_STACKS,
+    ANALYSIS_TIMEOUT_S, ANALYSIS_MAX_TIMEOUT_S, STAGE_BUDGETS,
+)
+from request_log import RequestLogMiddleware, RequestLogWriter
+from profiling import HotspotSampler, ProfileCapturer, ProfilingMiddleware, check_token, profile_worker
+from deadline import Deadline, DeadlineStats, deadline_scope
+from snapshot import FileWatcher, SnapshotStore, VersionedCache
+from catalog import DRUG_LIST_PATH
+from export import FORMATS as EXPORT_FORMATS, stream_export
+from fast_json import ENCODER as JSON_ENCODER, FastJSONResponse, dumps, loads
+
+try:
+    from side_effect_matrix import MATRIX_PATH, METRICS, SideEffectMatrix
+except ImportError:  # numpy/scipy not installed
+    SideEffectMatrix = None
+    MATRIX_PATH = DRUG_LIST_PATH.with_name('sideEffectMatrix.npz')
+    METRICS = ('cosine', 'jaccard')
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Drug Repurposing API",
     description="Scientific decision support API for pharmaceutical researchers",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -26,9 +58,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sampled request capture for replay (scripts/replay_requests.py)
+request_log_writer: Optional[RequestLogWriter] = None
+if REQUEST_LOG_ENABLED:
+    request_log_writer = RequestLogWriter(
+        REQUEST_LOG_PATH, REQUEST_LOG_MAX_BYTES, REQUEST_LOG_BACKUP_COUNT, REQUEST_LOG_QUEUE_SIZE
+    )
+    app.add_middleware(
+        RequestLogMiddleware,
+        writer=request_log_writer,
+        sample_rate=REQUEST_LOG_SAMPLE_RATE,
+        max_body_bytes=REQUEST_LOG_MAX_BODY_BYTES,
+    )
+
+# Opt-in request profiling (requires PROFILING_TOKEN) and background hotspot sampling
+profile_capturer: Optional[ProfileCapturer] = None
+if PROFILING_ENABLED:
+    profile_capturer = ProfileCapturer(
+        PROFILING_TOKEN, PROFILING_MAX_PER_MINUTE, PROFILING_SAMPLE_INTERVAL_MS / 1000
+    )
+    # A timed-out request's worker gets at most the longest allowed deadline to finish
+    app.add_middleware(ProfilingMiddleware, capturer=profile_capturer, max_wait=ANALYSIS_MAX_TIMEOUT_S)
+hotspot_sampler: Optional[HotspotSampler] = None
+
 # Initialize Master Agent (singleton)
 master_agent: Optional[MasterAgent] = None
 
+# Versioned catalog + mock data, swapped atomically on reload
+snapshot_store = SnapshotStore(extra_paths=[MATRIX_PATH])
+snapshot_watcher: Optional[FileWatcher] = None
+
+# Analysis results as encoded JSON bodies, invalidated whenever the data snapshot version changes
+analysis_cache = VersionedCache(max_entries=ANALYSIS_CACHE_SIZE)
+
+# Encoded /api/drugs body for the current snapshot version
+drug_list_cache = VersionedCache(max_entries=1)
+
+# Stage completions/overruns/timeouts across all requests
+deadline_stats = DeadlineStats()
+
+# Side-effect similarity matrix, rebuilt once per snapshot version
+similarity_cache = VersionedCache(max_entries=1)
+
 
 # Pydantic Models
 class AnalysisRequest(BaseModel):
@@ -37,11 +108,14 @@ class AnalysisRequest(BaseModel):
                                        description="Minimum semantic similarity threshold")
     risk_tolerance: float = Field(0.5, ge=0.0, le=1.0,
                                  description="IP/Evidence risk tolerance (0=strict, 1=permissive)")
+    timeout_s: Optional[float] = Field(None, gt=0, le=ANALYSIS_MAX_TIMEOUT_S,
+                                       description="Deadline in seconds (default ANALYSIS_TIMEOUT_S); slower stages return partial results")
 
 
 class EvidenceRequest(BaseModel):
     drug_name: str
     disease_name: str
+    timeout_s: Optional[float] = Field(None, gt=0, le=ANALYSIS_MAX_TIMEOUT_S)
 
 
 class ReportRequest(BaseModel):
@@ -49,16 +123,55 @@ class ReportRequest(BaseModel):
     results: List[dict]
 
 
+class ExportRequest(BaseModel):
+    drug_names: Optional[List[str]] = Field(None, description="Drugs to export; omit to use category or the whole catalog")
+    category: Optional[str] = Field(None, description="Export every catalog drug in this category")
+    format: str = Field("csv", description="csv, ndjson or parquet")
+    columns: Optional[List[str]] = Field(None, description="CSV/Parquet columns (default: drug, rank, error + first row's keys)")
+    similarity_threshold: float = Field(0.65, ge=0.0, le=1.0)
+    risk_tolerance: float = Field(0.5, ge=0.0, le=1.0)
+
+
 # API Endpoints
 @app.on_event("startup")
 async def startup_event():
     """Initialize Master Agent on startup"""
-    global master_agent
+    global master_agent, snapshot_watcher, hotspot_sampler
     print("Starting Drug Repurposing API...")
     master_agent = MasterAgent()
+    snapshot = snapshot_store.reload(force=True)
+    catalog = snapshot.catalog
+    print(f"✓ Catalog loaded: {len(catalog)} drugs, {len(catalog.side_effect_vocab)} side-effect terms")
+    if hasattr(master_agent, 'reload_data'):
+        # Let the agent rebuild its indexes/embeddings for snapshot.changed_drugs
+        snapshot_store.add_listener(master_agent.reload_data)
+    if HOT_RELOAD_ENABLED:
+        snapshot_watcher = FileWatcher(snapshot_store, interval=HOT_RELOAD_INTERVAL)
+        snapshot_watcher.start()
+        print(f"✓ Watching data files for changes (every {HOT_RELOAD_INTERVAL:g}s)")
+    if request_log_writer:
+        request_log_writer.start()
+        print(f"✓ Request log: {REQUEST_LOG_PATH} (sample rate {REQUEST_LOG_SAMPLE_RATE:.0%})")
+    if PROFILING_ENABLED and not PROFILING_TOKEN:
+        print("⚠ PROFILING_ENABLED is set but PROFILING_TOKEN is empty; profile requests will be refused")
+    if PROFILING_ENABLED and HOTSPOT_SAMPLER_ENABLED:
+        hotspot_sampler = HotspotSampler(interval=HOTSPOT_SAMPLE_INTERVAL_MS / 1000, max_stacks=HOTSPOT_MAX_STACKS)
+        hotspot_sampler.start()
+        print(f"✓ Hotspot sampler running (every {HOTSPOT_SAMPLE_INTERVAL_MS:g}ms)")
     print("✓ API ready to serve requests")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background threads and flush writers"""
+    if snapshot_watcher:
+        snapshot_watcher.stop()
+    if request_log_writer:
+        request_log_writer.stop()
+    if hotspot_sampler:
+        hotspot_sampler.stop()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -77,12 +190,157 @@ async def get_available_drugs():
     if not master_agent:
         raise HTTPException(status_code=503, detail="Master agent not initialized")
     
-    drugs = master_agent.get_available_drugs()
-    return {
+    version = snapshot_store.current.version
+    body = drug_list_cache.get(version, 'drugs')
+    if body is None:
+        drugs = master_agent.get_available_drugs()
+        body = dumps({
+            "success": True,
+            "count": len(drugs),
+            "drugs": drugs
+        })
+        drug_list_cache.put(version, 'drugs', body)
+    return FastJSONResponse(body)
+
+
+@app.get("/api/catalog")
+async def get_catalog(
+    category: Optional[str] = None,
+    side_effect: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Substring of generic or trade name"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Filter the drug catalog (drugList.json) by category, side effect or name
+    """
+    snapshot = snapshot_store.current
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="Drug catalog not loaded")
+    
+    matches = list(snapshot.catalog.filter(category=category, side_effect=side_effect, query=q))
+    return FastJSONResponse({
         "success": True,
-        "count": len(drugs),
-        "drugs": drugs
-    }
+        "version": snapshot.version,
+        "count": len(matches),
+        "drugs": [record.to_dict() for record in matches[offset:offset + limit]]
+    })
+
+
+def get_similarity_matrix(snapshot):
+    """Normalized drug x term matrix for the snapshot's catalog (built on first use)"""
+    matrix = similarity_cache.get(snapshot.version, 'matrix')
+    if matrix is None:
+        matrix = SideEffectMatrix.for_catalog(snapshot.catalog, MATRIX_PATH)
+        matrix.normalized()
+        similarity_cache.put(snapshot.version, 'matrix', matrix)
+    return matrix
+
+
+@app.get("/api/drugs/{name}/similar")
+def get_similar_drugs(
+    name: str,
+    metric: str = Query("cosine", description="cosine (frequency-weighted) or jaccard (set overlap)"),
+    k: int = Query(10, ge=1, le=100),
+    min_score: float = Query(0.0, ge=0.0, le=1.0)
+):
+    """
+    Find drugs with a side-effect profile similar to the given drug
+    (repurposing analogues), from the sparse drug x side-effect matrix
+    """
+    if SideEffectMatrix is None:
+        raise HTTPException(status_code=503, detail="Similarity search requires numpy and scipy")
+    if metric not in METRICS:
+        raise HTTPException(status_code=422, detail=f"metric must be one of: {', '.join(METRICS)}")
+    snapshot = snapshot_store.current
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="Drug catalog not loaded")
+    
+    record = snapshot.catalog.get(name)
+    matrix = get_similarity_matrix(snapshot)
+    row = matrix.row(record.name if record else name)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Drug not found: {name}")
+    
+    query_effects = set(snapshot.catalog.records[row].side_effects)
+    neighbors = []
+    for j, score in matrix.top_k([row], k=k, metric=metric, min_score=min_score)[0]:
+        neighbor = snapshot.catalog.records[j]
+        neighbors.append({
+            "name": neighbor.name,
+            "category": neighbor.category,
+            "approved_for": neighbor.approved_for,
+            "score": round(score, 4),
+            "shared_side_effects": [e for e in neighbor.side_effects if e in query_effects]
+        })
+    
+    return FastJSONResponse({
+        "success": True,
+        "drug": matrix.drugs[row],
+        "metric": metric,
+        "version": snapshot.version,
+        "count": len(neighbors),
+        "neighbors": neighbors
+    })
+
+
+class AnalysisFailed(Exception):
+    """MasterAgent returned success=False"""
+
+
+def new_deadline(timeout_s=None):
+    """Request deadline carrying the configured per-stage budgets"""
+    return Deadline(timeout_s or ANALYSIS_TIMEOUT_S, STAGE_BUDGETS, stats=deadline_stats)
+
+
+async def run_with_deadline(deadline, fn, *args):
+    """
+    Run a blocking agent call in the threadpool, keeping the event loop free
+    
+    The request is answered 504 once its deadline passes. Python cannot stop
+    the call, so the worker thread finishes in the background and its result
+    is discarded (a completed analysis is still cached).
+    """
+    try:
+        return await asyncio.wait_for(run_in_threadpool(fn, *args), deadline.timeout())
+    except (asyncio.TimeoutError, TimeoutError):
+        deadline_stats.record_timeout()
+        raise HTTPException(status_code=504, detail=f"Deadline exceeded after {deadline.elapsed():.1f}s")
+
+
+def run_analysis(drug_name, similarity_threshold, risk_tolerance, version, deadline=None, store=True):
+    """
+    Encoded JSON body of a MasterAgent analysis, served from the
+    version-scoped cache when possible (cache hits skip encoding entirely)
+    
+    The analysis runs under a request deadline; stages that run out of time
+    return partial results, and stages that overrun their budget are listed.
+    Flagged results are never cached. Bulk callers
+    pass ``store=False`` to read the cache without filling it.
+    """
+    cache_key = (drug_name.strip().lower(), similarity_threshold, risk_tolerance)
+    body = analysis_cache.get(version, cache_key)
+    if body is not None:
+        return body
+    
+    deadline = deadline or new_deadline()
+    try:
+        with deadline_scope(deadline), profile_worker():
+            result = master_agent.analyze_drug(
+                drug_name=drug_name,
+                similarity_threshold=similarity_threshold,
+                risk_tolerance=risk_tolerance
+            )
+    finally:
+        deadline_stats.record_request(deadline)
+    if not result['success']:
+        raise AnalysisFailed(result.get('error', 'Analysis failed'))
+    if deadline.flagged:
+        return dumps(deadline.annotate(result))
+    body = dumps(result)
+    if store:
+        analysis_cache.put(version, cache_key, body)
+    return body
 
 
 @app.post("/api/analyze")
@@ -100,20 +358,77 @@ async def analyze_drug(request: AnalysisRequest):
     if not master_agent:
         raise HTTPException(status_code=503, detail="Master agent not initialized")
     
+    # Pin the data version for this request; a concurrent reload won't affect it
+    version = snapshot_store.current.version
+    deadline = new_deadline(request.timeout_s)
+    
     try:
-        result = master_agent.analyze_drug(
-            drug_name=request.drug_name,
-            similarity_threshold=request.similarity_threshold,
-            risk_tolerance=request.risk_tolerance
+        body = await run_with_deadline(
+            deadline, run_analysis,
+            request.drug_name, request.similarity_threshold, request.risk_tolerance, version, deadline
         )
-        
-        if not result['success']:
-            raise HTTPException(status_code=404, detail=result.get('error', 'Analysis failed'))
-        
-        return result
-        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
+    
+    return FastJSONResponse(body)
+
+
+@app.post("/api/export")
+def export_results(request: ExportRequest):
+    """
+    Stream analysis results for one drug, a list, a category or the whole
+    catalog as chunked CSV, NDJSON or Parquet. Drugs are analyzed and encoded
+    one at a time, so memory stays flat regardless of export size. Drugs whose
+    analysis failed are exported as rows carrying an ``error``.
+    
+    Exports read cached analyses but do not add to the cache, so a portfolio
+    export cannot evict the entries interactive users rely on.
+    """
+    if not master_agent:
+        raise HTTPException(status_code=503, detail="Master agent not initialized")
+    if request.format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=422, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if request.format == 'parquet' and not PARQUET_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Parquet export requires pyarrow")
+    
+    if request.drug_names is not None and not request.drug_names:
+        # An explicit empty list must not fall through to a whole-catalog export
+        raise HTTPException(status_code=422, detail="drug_names must not be empty; omit it to export a category or the portfolio")
+    
+    snapshot = snapshot_store.current
+    if request.drug_names is not None:
+        drug_names = request.drug_names
+    else:
+        drug_names = (record.name for record in snapshot.catalog.filter(category=request.category))
+    
+    def results():
+        for drug_name in drug_names:
+            try:
+                body = run_analysis(drug_name, request.similarity_threshold, request.risk_tolerance, snapshot.version,
+                                    store=False)
+            except Exception as e:
+                yield drug_name, {'error': f"Analysis error: {str(e)}"}
+                continue
+            yield drug_name, loads(body)
+    
+    label = request.drug_names[0] if request.drug_names and len(request.drug_names) == 1 else (request.category or 'portfolio')
+    filename = f"{label.replace(' ', '_')}_results.{request.format}"
+    return StreamingResponse(
+        stream_export(results(), request.format, request.columns),
+        media_type=EXPORT_FORMATS[request.format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def fetch_evidence(drug_name, disease_name, deadline):
+    """MasterAgent evidence lookup under the request deadline (runs in the threadpool)"""
+    try:
+        with deadline_scope(deadline), profile_worker():
+            return master_agent.get_detailed_evidence(drug_name=drug_name, disease_name=disease_name)
+    finally:
+        deadline_stats.record_request(deadline)
 
 
 @app.post("/api/evidence")
@@ -125,18 +440,20 @@ async def get_detailed_evidence(request: EvidenceRequest):
     if not master_agent:
         raise HTTPException(status_code=503, detail="Master agent not initialized")
     
+    deadline = new_deadline(request.timeout_s)
     try:
-        evidence = master_agent.get_detailed_evidence(
-            drug_name=request.drug_name,
-            disease_name=request.disease_name
+        evidence = await run_with_deadline(
+            deadline, fetch_evidence, request.drug_name, request.disease_name, deadline
         )
-        return {
+        return FastJSONResponse(deadline.annotate({
             "success": True,
             "drug": request.drug_name,
             "disease": request.disease_name,
             "evidence": evidence
-        }
+        }))
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Evidence retrieval error: {str(e)}")
 
@@ -164,6 +481,61 @@ async def generate_report(request: ReportRequest):
         raise HTTPException(status_code=500, detail=f"Report generation error: {str(e)}")
 
 
+@app.post("/api/reload")
+def reload_data():
+    """
+    Force a rebuild of the catalog/mock data snapshot without restarting
+    (a plain def, so parsing runs in the threadpool, not on the event loop)
+    """
+    try:
+        snapshot = snapshot_store.reload(force=True)
+    except (OSError, ValueError, KeyError) as e:
+        raise HTTPException(status_code=500, detail=f"Reload error: {str(e)}")
+    
+    return {
+        "success": True,
+        "version": snapshot.version,
+        "drugs": len(snapshot.catalog),
+        "changed_drugs": len(snapshot.changed_drugs)
+    }
+
+
+@app.get("/api/profiling/hotspots")
+async def get_hotspots(
+    format: str = Query("json", description="json (top functions) or collapsed (flamegraph input)"),
+    top: int = Query(20, ge=1, le=500),
+    reset: bool = Query(False, description="Clear the aggregate after reading"),
+    x_profile_token: Optional[str] = Header(None)
+):
+    """
+    Aggregate hotspots recorded by the background sampler across all traffic
+    """
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling disabled")
+    if not check_token(x_profile_token, PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Profile-Token")
+    if hotspot_sampler is None:
+        raise HTTPException(status_code=503, detail="Hotspot sampler not running (set HOTSPOT_SAMPLER_ENABLED)")
+    
+    if format == "collapsed":
+        body = hotspot_sampler.collapsed()
+        response = PlainTextResponse(body, headers={"Content-Disposition": 'attachment; filename="hotspots.collapsed"'})
+    elif format == "json":
+        response = FastJSONResponse({
+            "success": True,
+            "since": hotspot_sampler.started_at,
+            "interval_ms": HOTSPOT_SAMPLE_INTERVAL_MS,
+            "samples": hotspot_sampler.samples,
+            "overflow": hotspot_sampler.overflow,
+            "hotspots": hotspot_sampler.top(top)
+        })
+    else:
+        raise HTTPException(status_code=422, detail="format must be json or collapsed")
+    if reset:
+        hotspot_sampler.reset()
+    return response
+
+
 @app.get("/api/health")
 async def health_check():
     """Detailed health check"""
@@ -178,6 +550,30 @@ async def health_check():
             "patent_ip": hasattr(master_agent, 'patent_agent') if master_agent else False,
             "scoring": hasattr(master_agent, 'scoring_agent') if master_agent else False,
             "report_generator": hasattr(master_agent, 'report_agent') if master_agent else False
+        },
+        "data": {
+            "version": snapshot_store.current.version if snapshot_store.current else None,
+            "drugs": len(snapshot_store.current.catalog) if snapshot_store.current else 0,
+            "reloads": snapshot_store.reloads,
+            "reload_errors": snapshot_store.reload_errors,
+            "analysis_cache": {"entries": len(analysis_cache), "hits": analysis_cache.hits, "misses": analysis_cache.misses}
+        },
+        "json_encoder": JSON_ENCODER,
+        "deadlines": {
+            "analysis_timeout_s": ANALYSIS_TIMEOUT_S,
+            "stage_budgets_s": STAGE_BUDGETS,
+            **deadline_stats.as_dict()
+        },
+        "profiling": {
+            "enabled": PROFILING_ENABLED,
+            "captures": profile_capturer.captures if profile_capturer else 0,
+            "rejected": profile_capturer.rejected if profile_capturer else 0,
+            "hotspot_samples": hotspot_sampler.samples if hotspot_sampler else 0
+        },
+        "request_log": {
+            "enabled": request_log_writer is not None,
+            "written": request_log_writer.written if request_log_writer else 0,
+            "dropped": request_log_writer.dropped if request_log_writer else 0
         }
     }
 
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+API Benchmark & Load Test
+Drives /api/drugs, /api/analyze, /api/evidence and /api/report with a
+replayable workload and reports throughput, p50/p95/p99 latency, error rate
+and peak RSS.
+
+Modes:
+    in-process  FastAPI TestClient against api.app (no network, includes startup)
+    http        requests.Session against a running server (--url)
+
+Workloads are JSONL, one request per line:
+    {"method": "POST", "path": "/api/analyze", "body": {"drug_name": "Metformin"}}
+
+Usage:
+    python benchmarks/bench_api.py --mode in-process --requests 200
+    python benchmarks/bench_api.py --mode http --url http://localhost:8000 --concurrency 8
+    python benchmarks/bench_api.py --workload my_workload.jsonl --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+DRUG_LIST_PATH = ROOT / 'src' / 'drugList.json'
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+# Relative frequency of each endpoint in a generated workload
+DEFAULT_MIX = {
+    '/api/drugs': 0.2,
+    '/api/analyze': 0.4,
+    '/api/evidence': 0.3,
+    '/api/report': 0.1,
+}
+
+DISEASES = [
+    "Cancer Prevention", "Alzheimer's Disease", "Obesity Treatment",
+    "Colorectal Cancer Prevention", "Cardiovascular Protection", "Parkinson's Disease",
+]
+
+# Metrics where a higher value is a regression, and those where lower is
+LOWER_IS_BETTER = ('p50_ms', 'p95_ms', 'p99_ms', 'error_rate', 'peak_rss_mb')
+HIGHER_IS_BETTER = ('throughput_rps',)
+
+
+def load_drug_names():
+    with open(DRUG_LIST_PATH, 'r', encoding='utf-8') as f:
+        return [drug['name'] for drug in json.load(f)]
+
+
+def generate_workload(n, seed=0, mix=None):
+    """Build a deterministic workload of n requests"""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    drugs = load_drug_names()
+    paths = list(mix)
+    weights = [mix[p] for p in paths]
+
+    workload = []
+    for _ in range(n):
+        path = rng.choices(paths, weights)[0]
+        drug = rng.choice(drugs)
+        if path == '/api/drugs':
+            workload.append({'method': 'GET', 'path': path})
+        elif path == '/api/analyze':
+            workload.append({'method': 'POST', 'path': path, 'body': {
+                'drug_name': drug,
+                'similarity_threshold': rng.choice([0.5, 0.65, 0.8]),
+                'risk_tolerance': rng.choice([0.3, 0.5, 0.7]),
+            }})
+        elif path == '/api/evidence':
+            workload.append({'method': 'POST', 'path': path, 'body': {
+                'drug_name': drug, 'disease_name': rng.choice(DISEASES),
+            }})
+        else:
+            workload.append({'method': 'POST', 'path': path, 'body': {
+                'drug_name': drug,
+                'results': [{'disease': d, 'confidence': round(rng.random(), 2)} for d in rng.sample(DISEASES, 2)],
+            }})
+    return workload
+
+
+def load_workload(path):
+    """Read a JSONL workload (also accepts request logs with extra fields)"""
+    workload = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            workload.append({'method': entry.get('method', 'GET'), 'path': entry['path'], 'body': entry.get('body')})
+    return workload
+
+
+def save_workload(workload, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for entry in workload:
+            f.write(json.dumps(entry) + '\n')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples, elapsed):
+    """samples: list of (latency_seconds, ok)"""
+    latencies = sorted(s[0] * 1000 for s in samples)
+    errors = sum(1 for s in samples if not s[1])
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+        'mean_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1] if latencies else 0.0,
+    }
+
+
+def self_peak_rss_mb():
+    """Peak RSS of this process, None where the resource module is unavailable (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def process_peak_rss_mb(pid):
+    """Peak RSS of another process (Linux /proc), None if unavailable"""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class InProcessTarget:
+    """Runs requests through FastAPI's TestClient in this process"""
+
+    def __init__(self):
+        sys.path.insert(0, str(ROOT))
+        from fastapi.testclient import TestClient
+        import api
+
+        self.client = TestClient(api.app)
+        self.client.__enter__()  # fires startup events
+
+    def send(self, entry):
+        response = self.client.request(entry['method'], entry['path'], json=entry.get('body'))
+        return response.status_code
+
+    def close(self):
+        self.client.__exit__(None, None, None)
+
+
+class HTTPTarget:
+    """Runs requests over HTTP with a pooled session per worker thread"""
+
+    def __init__(self, url, timeout):
+        import requests
+
+        self.requests = requests
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def send(self, entry):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = self.requests.Session()
+        try:
+            response = session.request(entry['method'], self.url + entry['path'], json=entry.get('body'), timeout=self.timeout)
+            return response.status_code
+        except self.requests.RequestException:
+            return 0
+
+    def close(self):
+        pass
+
+
+def run(target, workload, concurrency, warmup):
+    """Execute the workload, returning per-request (path, latency, ok) samples"""
+    for entry in workload[:warmup]:
+        target.send(entry)
+
+    def timed(entry):
+        start = time.perf_counter()
+        status = target.send(entry)
+        return entry['path'], time.perf_counter() - start, 200 <= status < 400
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        samples = [timed(entry) for entry in workload]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed, workload))
+    return samples, time.perf_counter() - start
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(result, baseline, tolerance):
+    """Return human-readable regressions of result vs baseline"""
+    regressions = []
+    for scope, current in [('overall', result['overall'])] + sorted(result['endpoints'].items()):
+        previous = baseline['overall'] if scope == 'overall' else baseline.get('endpoints', {}).get(scope)
+        if not previous:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            if metric in LOWER_IS_BETTER:
+                # Error rate is compared absolutely; everything else relatively
+                worse = new > old + tolerance if metric == 'error_rate' else new > old * (1 + tolerance) and new - old > 1e-9
+            else:
+                worse = new < old * (1 - tolerance)
+            if worse:
+                regressions.append(f"{scope} {metric}: {old:.2f} → {new:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and load-test api.py")
+    parser.add_argument('--mode', choices=['in-process', 'http'], default='in-process')
+    parser.add_argument('--url', default='http://localhost:8000', help="Server URL for --mode http")
+    parser.add_argument('--server-pid', type=int, help="Server PID for peak RSS in --mode http")
+    parser.add_argument('--workload', help="JSONL workload to replay (default: generated)")
+    parser.add_argument('--requests', type=int, default=200, help="Generated workload size")
+    parser.add_argument('--seed', type=int, default=0, help="Generated workload seed")
+    parser.add_argument('--save-workload', help="Write the workload used to this JSONL path")
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=5, help="Requests sent before timing starts")
+    parser.add_argument('--timeout', type=float, default=120, help="Per-request timeout in --mode http")
+    parser.add_argument('--output', help="Result JSON path (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument('--compare', help="Baseline result JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed relative regression vs baseline")
+    args = parser.parse_args()
+
+    workload = load_workload(args.workload) if args.workload else generate_workload(args.requests, args.seed)
+    if args.save_workload:
+        save_workload(workload, args.save_workload)
+
+    print("=" * 60)
+    print("API BENCHMARK")
+    print("=" * 60)
+    print(f"🎯 Mode: {args.mode}{' → ' + args.url if args.mode == 'http' else ''}")
+    print(f"📊 Workload: {len(workload)} requests ({args.workload or f'generated, seed={args.seed}'})")
+    print(f"🔀 Concurrency: {args.concurrency}")
+    print()
+
+    startup = time.perf_counter()
+    target = InProcessTarget() if args.mode == 'in-process' else HTTPTarget(args.url, args.timeout)
+    startup = time.perf_counter() - startup
+    try:
+        samples, elapsed = run(target, workload, args.concurrency, args.warmup)
+    finally:
+        target.close()
+
+    if args.mode == 'in-process':
+        peak_rss = self_peak_rss_mb()
+    else:
+        peak_rss = process_peak_rss_mb(args.server_pid) if args.server_pid else None
+
+    by_path = {}
+    for path, latency, ok in samples:
+        by_path.setdefault(path, []).append((latency, ok))
+
+    overall = summarize([(latency, ok) for _, latency, ok in samples], elapsed)
+    overall['peak_rss_mb'] = peak_rss
+    result = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'mode': args.mode,
+        'url': args.url if args.mode == 'http' else None,
+        'concurrency': args.concurrency,
+        'workload': args.workload or {'generated': True, 'requests': args.requests, 'seed': args.seed},
+        'startup_s': startup,
+        'elapsed_s': elapsed,
+        'overall': overall,
+        'endpoints': {path: summarize(values, elapsed) for path, values in sorted(by_path.items())},
+    }
+
+    print(f"{'endpoint':<16}{'reqs':>7}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for name, stats in list(result['endpoints'].items()) + [('overall', overall)]:
+        print(f"{name:<16}{stats['requests']:>7}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>10.1f}"
+              f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['error_rate']:>9.1%}")
+    print()
+    print(f"💾 Peak RSS: {f'{peak_rss:.1f} MB' if peak_rss is not None else 'n/a (pass --server-pid)'}")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{result['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"✅ Saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        print()
+        if regressions:
+            print(f"❌ Regressions vs {baseline.get('commit', args.compare)} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"   • {line}")
+            sys.exit(1)
+        print(f"✅ No regressions vs {baseline.get('commit', args.compare)}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
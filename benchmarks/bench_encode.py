@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+JSON Encode Benchmark
+Times response encoding for realistic /api/analyze, /api/drugs and
+/api/catalog payload sizes:
+
+    fastapi   jsonable_encoder + json.dumps (FastAPI's default path for dicts)
+    fast_json fast_json.dumps (orjson when installed, numpy encoded natively)
+
+Cached /api/analyze and /api/drugs responses store this encoded body, so a
+cache hit does no encoding at all.
+
+Analysis payloads are synthetic (MasterAgent-shaped candidates with numpy
+scores); drug/catalog payloads come from src/drugList.json.
+
+Usage:
+    python benchmarks/bench_encode.py
+    python benchmarks/bench_encode.py --repeat 50 --candidates 30 300 3000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+from catalog import DRUG_LIST_PATH, DrugCatalog  # noqa: E402
+from fast_json import ENCODER, dumps  # noqa: E402
+
+DISEASES = [
+    "Cancer Prevention", "Alzheimer's Disease", "Obesity Treatment",
+    "Colorectal Cancer Prevention", "Cardiovascular Protection", "Parkinson's Disease",
+]
+
+
+def analysis_payload(drug, n_candidates, rng):
+    """MasterAgent.analyze_drug-shaped result with n ranked candidates"""
+    candidates = []
+    for rank in range(n_candidates):
+        candidates.append({
+            'disease': f"{rng.choice(DISEASES)} #{rank}",
+            'rank': rank + 1,
+            'composite_score': np.float64(rng.random()),
+            'scores': {
+                'semantic_similarity': np.float32(rng.random()),
+                'evidence_strength': np.float32(rng.random()),
+                'ip_risk': np.float32(rng.random()),
+            },
+            'matched_side_effects': [f"SIDE EFFECT {rng.randint(1, 500)}" for _ in range(5)],
+            'similarity_vector': np.asarray([rng.random() for _ in range(16)], dtype=np.float32),
+            'evidence': {
+                'pubmed': [{'pmid': str(rng.randint(10**7, 10**8)), 'title': f"Study of {drug} " + "x" * 60}
+                           for _ in range(3)],
+                'clinical_trials': [{'nct_id': f"NCT{rng.randint(10**7, 10**8)}", 'phase': rng.choice(['1', '2', '3'])}
+                                    for _ in range(2)],
+            },
+            'patent_status': rng.choice(['expired', 'active', 'unknown']),
+        })
+    return {'success': True, 'drug': drug, 'count': n_candidates, 'results': candidates}
+
+
+def fastapi_encode(payload):
+    """What FastAPI's default JSONResponse does for a returned dict"""
+    # jsonable_encoder cannot walk numpy values, so convert them the way an endpoint would have to
+    content = jsonable_encoder(payload, custom_encoder={np.ndarray: np.ndarray.tolist, np.generic: np.generic.item})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')).encode('utf-8')
+
+
+def time_ms(fn, payload, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def build_payloads(candidate_counts, seed):
+    rng = random.Random(seed)
+    payloads = [(f"analyze ({n} candidates)", analysis_payload('Metformin', n, rng)) for n in candidate_counts]
+    catalog = DrugCatalog.load(DRUG_LIST_PATH)
+    payloads.append((f"drugs ({len(catalog)} names)",
+                     {'success': True, 'count': len(catalog), 'drugs': [record.name for record in catalog]}))
+    records = [record.to_dict() for record in catalog][:1000]
+    payloads.append((f"catalog ({len(records)} records)",
+                     {'success': True, 'version': 1, 'count': len(records), 'drugs': records}))
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON response encoding")
+    parser.add_argument('--repeat', type=int, default=30, help="Timed encodes per payload (median reported)")
+    parser.add_argument('--candidates', type=int, nargs='+', default=[30, 300, 3000],
+                        help="Candidate counts for synthetic /api/analyze payloads")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print("=" * 71)
+    print(f"JSON ENCODE BENCHMARK (fast_json encoder: {ENCODER})")
+    print("=" * 71)
+    print(f"{'payload':<28}{'size':>10}{'fastapi':>12}{'fast_json':>12}{'speedup':>9}")
+
+    for label, payload in build_payloads(args.candidates, args.seed):
+        body = dumps(payload)
+        baseline = time_ms(fastapi_encode, payload, args.repeat)
+        fast = time_ms(dumps, payload, args.repeat)
+        print(f"{label:<28}{len(body) / 1024:>8.0f}KB{baseline:>10.2f}ms{fast:>10.2f}ms"
+              f"{baseline / fast:>8.1f}x")
+
+    print("=" * 71)
+
+
+if __name__ == "__main__":
+    main()
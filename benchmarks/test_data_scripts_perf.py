@@ -0,0 +1,219 @@
+"""
+Data Script Performance Regression Tests
+Times the hot paths of the data scripts on a synthetic catalog
+(scripts/generate_synthetic_catalog.py) and fails when one gets
+significantly slower or more memory hungry than its tracked baseline in
+benchmarks/perf_thresholds.json.
+
+Each measurement records the best wall time of a few rounds plus the peak
+traced allocation (tracemalloc) of one extra round. A metric fails when it
+exceeds baseline * (1 + PERF_TOLERANCE) plus a small absolute slack, so
+sub-millisecond jitter does not trip it.
+
+Peak memory is deterministic and always checked. Wall times depend on the
+machine the baselines were recorded on (``_recorded_on`` in the thresholds
+file), so they are only checked with PERF_CHECK=1, on comparable hardware.
+
+Usage:
+    python -m pytest benchmarks/test_data_scripts_perf.py -q
+    PERF_CHECK=1 python -m pytest benchmarks/test_data_scripts_perf.py -q       # also check wall times
+    PERF_CATALOG_SIZE=100000 python -m pytest benchmarks/test_data_scripts_perf.py -q -s
+    PERF_UPDATE_THRESHOLDS=1 python -m pytest benchmarks/test_data_scripts_perf.py -q   # re-baseline
+
+Baselines are kept per catalog size; sizes without a baseline are measured
+and reported but not checked.
+"""
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import zlib
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('scipy')
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'scripts'))
+from catalog import DrugCatalog  # noqa: E402
+from side_effect_matrix import SideEffectMatrix  # noqa: E402
+from fetch_side_effects import enrich_catalog  # noqa: E402
+from generate_drug_list import create_drug_list_json, generate_drug_descriptions  # noqa: E402
+from generate_synthetic_catalog import build_vocabulary, generate_drugs, load_sample, synthetic_counts  # noqa: E402
+
+THRESHOLDS_PATH = Path(__file__).parent / 'perf_thresholds.json'
+SIZE = int(os.getenv('PERF_CATALOG_SIZE', '10000'))
+TOLERANCE = float(os.getenv('PERF_TOLERANCE', '0.5'))
+UPDATE = os.getenv('PERF_UPDATE_THRESHOLDS', '').strip().lower() in ('1', 'true', 'yes', 'on')
+CHECK_TIMES = os.getenv('PERF_CHECK', '').strip().lower() in ('1', 'true', 'yes', 'on')
+ROUNDS = int(os.getenv('PERF_ROUNDS', '3'))
+
+# Absolute slack added to every limit
+SLACK = {'seconds': 0.02, 'peak_mb': 1.0}
+
+
+def machine_info():
+    """Where baselines are recorded, stored alongside them"""
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpu = next(line.split(':', 1)[1].strip() for line in f if line.startswith('model name'))
+    except (OSError, StopIteration):
+        pass
+    return {'cpu': cpu, 'cpus': os.cpu_count(), 'platform': platform.platform(), 'python': platform.python_version()}
+
+
+class PerfRecorder:
+    """Measures named hot paths and checks them against tracked baselines"""
+
+    def __init__(self, baselines):
+        self.baselines = baselines
+        self.results = {}
+
+    def __call__(self, name, fn, setup=None, rounds=ROUNDS):
+        """Run fn(*setup()) and check it; setup builds fresh inputs outside the timed region"""
+        times = []
+        result = None
+        for _ in range(rounds):
+            args = setup() if setup else ()
+            start = time.perf_counter()
+            result = fn(*args)
+            times.append(time.perf_counter() - start)
+
+        args = setup() if setup else ()
+        tracemalloc.start()
+        try:
+            fn(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        measured = {'seconds': round(min(times), 4), 'peak_mb': round(peak / 2 ** 20, 2)}
+        self.results[name] = measured
+        print(f"\n  {name} [{SIZE} drugs]: {measured['seconds'] * 1000:.1f} ms, peak {measured['peak_mb']:.1f} MB")
+
+        baseline = self.baselines.get(str(SIZE), {}).get(name)
+        if baseline and not UPDATE:
+            for metric, value in measured.items():
+                if metric == 'seconds' and not CHECK_TIMES:
+                    continue
+                limit = baseline[metric] * (1 + TOLERANCE) + SLACK[metric]
+                assert value <= limit, (
+                    f"{name} {metric} regressed: {value} > {limit:.4f} "
+                    f"(baseline {baseline[metric]}, tolerance {TOLERANCE:.0%})"
+                )
+        return result
+
+
+@pytest.fixture(scope='module')
+def perf():
+    baselines = json.loads(THRESHOLDS_PATH.read_text()) if THRESHOLDS_PATH.exists() else {}
+    recorder = PerfRecorder(baselines)
+    yield recorder
+    if UPDATE and recorder.results:
+        baselines.setdefault(str(SIZE), {}).update(recorder.results)
+        baselines['_recorded_on'] = machine_info()
+        THRESHOLDS_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+
+@pytest.fixture(scope='module')
+def sample():
+    return load_sample()
+
+
+@pytest.fixture(scope='module')
+def drugs(sample):
+    return list(generate_drugs(SIZE, seed=0, sample=sample))
+
+
+@pytest.fixture(scope='module')
+def catalog(drugs):
+    return DrugCatalog.from_dicts(drugs)
+
+
+@pytest.fixture(scope='module')
+def catalog_path(catalog, tmp_path_factory):
+    path = tmp_path_factory.mktemp('perf') / 'drugList.json'
+    catalog.dump(path)
+    return path
+
+
+def stub_fetch(vocabulary):
+    """Deterministic OpenFDA stand-in: ~20% no data, ~4% errors, otherwise a 20-term count profile"""
+    def fetch(name):
+        h = zlib.crc32(name.encode('utf-8'))
+        if h % 5 == 0:
+            return [], True
+        if h % 25 == 0:
+            return [], False
+        start = h % (len(vocabulary) - 20)
+        return [{'term': term, 'count': 5000 // rank} for rank, term in enumerate(vocabulary[start:start + 20], 1)], True
+    return fetch
+
+
+def test_generate_synthetic_catalog(perf, sample):
+    drugs = perf('generate_synthetic', lambda: list(generate_drugs(SIZE, seed=0, sample=sample)))
+    assert len(drugs) == SIZE
+    assert len({drug['name'] for drug in drugs}) == SIZE
+
+
+def test_generate_drug_list_conversion(perf, drugs):
+    frame = pd.DataFrame({
+        'name': [drug['name'] for drug in drugs],
+        'trade_name': [drug['tradeName'] for drug in drugs],
+        'category': [drug['category'] for drug in drugs],
+        'indication': [drug['approvedFor'] for drug in drugs],
+    })
+    drug_list = perf(
+        'generate_drug_list_json',
+        lambda df: create_drug_list_json(generate_drug_descriptions(df)),
+        setup=lambda: (frame.copy(),),
+    )
+    assert len(drug_list) == SIZE
+
+
+def test_enrich_catalog_against_stub(perf, drugs, sample):
+    fetch = stub_fetch(build_vocabulary(sample))
+    unenriched = [{**drug, 'sideEffects': [], 'enriched': False} for drug in drugs]
+    stats = perf(
+        'enrich_catalog',
+        lambda catalog: enrich_catalog(catalog, fetch=fetch, delay=0, progress=False),
+        setup=lambda: (DrugCatalog.from_dicts(unenriched),),
+    )
+    assert stats['pending'] == SIZE
+    assert stats['groups'] <= stats['api_calls'] < SIZE
+    assert stats['enriched'] + stats['generic'] + stats['failed'] == SIZE
+
+
+def test_catalog_load(perf, catalog_path):
+    loaded = perf('catalog_load', DrugCatalog.load, setup=lambda: (catalog_path,))
+    assert len(loaded) == SIZE
+
+
+def test_catalog_dump(perf, catalog, tmp_path):
+    path = tmp_path / 'drugList.json'
+    perf('catalog_dump', catalog.dump, setup=lambda: (path,))
+    assert path.stat().st_size > 0
+
+
+def test_side_effect_matrix_build(perf, catalog):
+    counts = synthetic_counts(catalog, seed=0)
+    matrix = perf(
+        'matrix_build',
+        lambda: SideEffectMatrix.build(catalog, counts),
+    )
+    perf('matrix_normalize', lambda m: m.normalized(), setup=lambda: (SideEffectMatrix(matrix.matrix, matrix.drugs, matrix.terms),))
+    assert matrix.shape[0] == SIZE
+
+
+def test_side_effect_matrix_save_load(perf, catalog, tmp_path):
+    matrix = SideEffectMatrix.build(catalog, synthetic_counts(catalog, seed=0))
+    path = tmp_path / 'sideEffectMatrix.npz'
+    perf('matrix_save', matrix.save, setup=lambda: (path,))
+    loaded = perf('matrix_load', SideEffectMatrix.load, setup=lambda: (path,))
+    assert loaded.shape == matrix.shape
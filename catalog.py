@@ -0,0 +1,234 @@
+"""
+Drug Catalog
+Compact in-memory model of src/drugList.json shared by the API and scripts.
+
+Each drug is a __slots__ record. Side effects are stored as an array of integer
+ids into a catalog-wide vocabulary, and category / indication / description /
+data source strings live in a shared string table, so the uppercase MedDRA terms
+repeated across thousands of drugs are held once.
+"""
+import json
+from array import array
+from pathlib import Path
+
+DRUG_LIST_PATH = Path(__file__).parent / 'src' / 'drugList.json'
+
+# drugList.json keys in their on-disk order
+FIELDS = ('name', 'tradeName', 'approvedFor', 'description', 'category',
+          'sideEffects', 'enriched', 'lastUpdated', 'dataSource')
+
+
+class StringTable:
+    """Interns strings to dense integer ids
+
+    With ``fold_case`` the table also indexes ids by case-folded value, for
+    case-insensitive lookups that leave the stored strings untouched.
+    """
+
+    __slots__ = ('_ids', '_strings', '_folded')
+
+    def __init__(self, fold_case=False):
+        self._ids = {}
+        self._strings = []
+        self._folded = {} if fold_case else None
+
+    def intern(self, value):
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self._strings)
+            self._ids[value] = value_id
+            self._strings.append(value)
+            if self._folded is not None:
+                self._folded.setdefault(value.casefold(), []).append(value_id)
+        return value_id
+
+    def get_id(self, value):
+        return self._ids.get(value)
+
+    def get_ids_folded(self, value):
+        """Ids of every interned spelling of ``value``, ignoring case"""
+        return tuple(self._folded.get(value.casefold(), ()))
+
+    def __getitem__(self, value_id):
+        return self._strings[value_id]
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __iter__(self):
+        return iter(self._strings)
+
+
+class DrugRecord:
+    """One drug; shared-table fields are decoded through the owning catalog"""
+
+    __slots__ = ('_catalog', 'name', 'trade_name', 'enriched', 'last_updated',
+                 '_category', '_approved_for', '_description', '_data_source',
+                 '_side_effects', '_extra')
+
+    def __init__(self, catalog, drug):
+        strings = catalog.strings
+        self._catalog = catalog
+        self.name = drug['name']
+        self.trade_name = drug.get('tradeName', '')
+        self.enriched = bool(drug.get('enriched', False))
+        self.last_updated = drug.get('lastUpdated')
+        self._category = strings.intern(drug.get('category') or 'Other')
+        self._approved_for = strings.intern(drug.get('approvedFor', ''))
+        self._description = strings.intern(drug.get('description', ''))
+        data_source = drug.get('dataSource')
+        self._data_source = strings.intern(data_source) if data_source is not None else -1
+        self.side_effects = drug.get('sideEffects') or []
+        extra = {k: v for k, v in drug.items() if k not in FIELDS}
+        self._extra = extra or None
+
+    @property
+    def category(self):
+        return self._catalog.strings[self._category]
+
+    @property
+    def approved_for(self):
+        return self._catalog.strings[self._approved_for]
+
+    @property
+    def description(self):
+        return self._catalog.strings[self._description]
+
+    @property
+    def data_source(self):
+        return self._catalog.strings[self._data_source] if self._data_source >= 0 else None
+
+    @data_source.setter
+    def data_source(self, value):
+        self._data_source = self._catalog.strings.intern(value) if value is not None else -1
+
+    @property
+    def side_effects(self):
+        vocab = self._catalog.side_effect_vocab
+        return [vocab[i] for i in self._side_effects]
+
+    @side_effects.setter
+    def side_effects(self, terms):
+        vocab = self._catalog.side_effect_vocab
+        self._side_effects = array('I', (vocab.intern(term) for term in terms))
+
+    @property
+    def side_effect_ids(self):
+        return self._side_effects
+
+    def has_side_effect(self, term):
+        """Case-insensitive, like DrugCatalog.filter(side_effect=...)"""
+        return any(term_id in self._side_effects
+                   for term_id in self._catalog.side_effect_vocab.get_ids_folded(term))
+
+    def to_dict(self):
+        """drugList.json-shaped dict"""
+        drug = {
+            'name': self.name,
+            'tradeName': self.trade_name,
+            'approvedFor': self.approved_for,
+            'description': self.description,
+            'category': self.category,
+            'sideEffects': self.side_effects,
+            'enriched': self.enriched,
+            'lastUpdated': self.last_updated,
+        }
+        if self._data_source >= 0:
+            drug['dataSource'] = self.data_source
+        if self._extra:
+            drug.update(self._extra)
+        return drug
+
+    def __repr__(self):
+        return f"DrugRecord({self.name!r}, category={self.category!r})"
+
+
+class DrugCatalog:
+    """Ordered collection of DrugRecords with name lookup and filtering"""
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.side_effect_vocab = StringTable(fold_case=True)
+        self.records = []
+        self._by_name = {}
+
+    @classmethod
+    def from_dicts(cls, drugs):
+        catalog = cls()
+        for drug in drugs:
+            catalog.add(drug)
+        return catalog
+
+    @classmethod
+    def load(cls, path=DRUG_LIST_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dicts(json.load(f))
+
+    def add(self, drug):
+        record = DrugRecord(self, drug)
+        self.records.append(record)
+        self._by_name.setdefault(record.name.lower(), record)
+        if record.trade_name:
+            self._by_name.setdefault(record.trade_name.lower(), record)
+        return record
+
+    def get(self, name):
+        """Case-insensitive lookup by generic or trade name"""
+        return self._by_name.get((name or '').strip().lower())
+
+    def filter(self, category=None, side_effect=None, data_source=None, query=None):
+        """Yield records matching every given criterion"""
+        category_id = self.strings.get_id(category) if category is not None else None
+        source_id = self.strings.get_id(data_source) if data_source is not None else None
+        # OpenFDA terms are uppercase but generic fallbacks are Title Case, so match either
+        term_ids = self.side_effect_vocab.get_ids_folded(side_effect) if side_effect is not None else None
+        if ((category is not None and category_id is None)
+                or (data_source is not None and source_id is None)
+                or (side_effect is not None and not term_ids)):
+            return
+        query = query.lower() if query else None
+
+        for record in self.records:
+            if category_id is not None and record._category != category_id:
+                continue
+            if source_id is not None and record._data_source != source_id:
+                continue
+            if term_ids and not any(term_id in record._side_effects for term_id in term_ids):
+                continue
+            if query and query not in record.name.lower() and query not in record.trade_name.lower():
+                continue
+            yield record
+
+    def categories(self):
+        """Drug count per category"""
+        counts = {}
+        for record in self.records:
+            counts[record._category] = counts.get(record._category, 0) + 1
+        return {self.strings[category_id]: n for category_id, n in counts.items()}
+
+    def iter_dicts(self):
+        for record in self.records:
+            yield record.to_dict()
+
+    def to_dicts(self):
+        return list(self.iter_dicts())
+
+    def dump(self, path=DRUG_LIST_PATH, indent=2):
+        """Write drugList.json, streaming one record at a time"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pad = ' ' * indent if indent else ''
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for i, drug in enumerate(self.iter_dicts()):
+                text = json.dumps(drug, indent=indent, ensure_ascii=False)
+                if indent:
+                    text = text.replace('\n', '\n' + pad)
+                f.write((',' if i else '') + ('\n' + pad if indent else '') + text)
+            f.write('\n]' if indent and self.records else ']')
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
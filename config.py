@@ -0,0 +1,56 @@
+"""
+Configuration
+Settings are read from the environment (see .env.example) with local defaults.
+"""
+import os
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Application Settings
+APP_HOST = os.getenv("APP_HOST", "0.0.0.0")
+APP_PORT = int(os.getenv("APP_PORT", "8000"))
+DEBUG = _env_bool("DEBUG", False)
+
+# Request log capture (replay with scripts/replay_requests.py)
+REQUEST_LOG_ENABLED = _env_bool("REQUEST_LOG_ENABLED", False)
+REQUEST_LOG_PATH = os.getenv("REQUEST_LOG_PATH", "logs/requests.jsonl")
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1.0"))
+REQUEST_LOG_MAX_BYTES = int(os.getenv("REQUEST_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+REQUEST_LOG_BACKUP_COUNT = int(os.getenv("REQUEST_LOG_BACKUP_COUNT", "5"))
+REQUEST_LOG_MAX_BODY_BYTES = int(os.getenv("REQUEST_LOG_MAX_BODY_BYTES", str(64 * 1024)))
+REQUEST_LOG_QUEUE_SIZE = int(os.getenv("REQUEST_LOG_QUEUE_SIZE", "10000"))
+
+# Hot reload of src/drugList.json and data/mock without restarting the API
+HOT_RELOAD_ENABLED = _env_bool("HOT_RELOAD_ENABLED", True)
+HOT_RELOAD_INTERVAL = float(os.getenv("HOT_RELOAD_INTERVAL", "2.0"))
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))
+
+# Profiling: per-request captures (?profile=cprofile|sampling + X-Profile-Token)
+# and a background hotspot sampler. Both stay off unless enabled with a token.
+PROFILING_ENABLED = _env_bool("PROFILING_ENABLED", False)
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_MAX_PER_MINUTE = int(os.getenv("PROFILING_MAX_PER_MINUTE", "6"))
+PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+HOTSPOT_SAMPLER_ENABLED = _env_bool("HOTSPOT_SAMPLER_ENABLED", False)
+HOTSPOT_SAMPLE_INTERVAL_MS = float(os.getenv("HOTSPOT_SAMPLE_INTERVAL_MS", "100"))
+HOTSPOT_MAX_STACKS = int(os.getenv("HOTSPOT_MAX_STACKS", "5000"))
+
+# Per-request deadlines (seconds) propagated through the MasterAgent stages;
+# a stage out of time returns partial, flagged results instead of hanging
+ANALYSIS_TIMEOUT_S = float(os.getenv("ANALYSIS_TIMEOUT_S", "60"))
+ANALYSIS_MAX_TIMEOUT_S = float(os.getenv("ANALYSIS_MAX_TIMEOUT_S", "300"))
+STAGE_BUDGETS = {
+    stage: float(os.getenv(f"STAGE_BUDGET_{stage.upper()}", default))
+    for stage, default in {
+        "side_effects": "5",
+        "nlp": "15",
+        "disease_matching": "10",
+        "evidence": "20",
+        "patent": "10",
+        "scoring": "5",
+        "report": "30",
+    }.items()
+}
@@ -0,0 +1,200 @@
+"""
+Request Deadlines
+Per-request deadline propagated through the MasterAgent pipeline stages.
+
+The API creates a Deadline for each analysis and makes it current for the
+request (``current_deadline()``), so agents pick it up without extra
+arguments. Each stage runs through ``run_stage``, which allows it the smaller
+of its configured budget and the time left on the request. A stage that
+runs out of time returns its fallback value instead of holding the worker,
+and the result is flagged, e.g. ``"evidence incomplete"``. A stage runs out
+of time when it starts after the deadline, raises DeadlineExceeded, or its
+upstream call times out. A stage that finishes but overran its budget keeps
+its value and is flagged separately, e.g. ``"evidence over budget"``.
+
+Python cannot interrupt a running call, so stages bound blocking work with
+``deadline.timeout(stage)``, e.g. as the ``timeout=`` of an HTTP lookup.
+
+    def retrieve_evidence(drug, disease):
+        deadline = current_deadline()
+        return session.get(url, timeout=deadline.timeout('evidence')).json()
+
+    evidence = run_stage('evidence', retrieve_evidence, drug, disease, fallback=[])
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    from requests import Timeout as _RequestsTimeout
+    TIMEOUT_ERRORS = (TimeoutError, _RequestsTimeout)
+except ImportError:
+    TIMEOUT_ERRORS = (TimeoutError,)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised by Deadline.check() once the request has no time left"""
+
+
+class Deadline:
+    """Absolute request deadline plus per-stage budgets (seconds)"""
+
+    def __init__(self, timeout=None, budgets=None, stats=None):
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + timeout if timeout else None
+        self.budgets = dict(budgets or {})
+        self.stats = stats
+        self.incomplete = []
+        self.over_budget = []
+
+    def remaining(self):
+        if self.expires_at is None:
+            return float('inf')
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def timeout(self, stage=None):
+        """Seconds a call in ``stage`` may take (None = unbounded, as requests expects)"""
+        limit = min(self.remaining(), self.budgets.get(stage, float('inf')))
+        return None if limit == float('inf') else limit
+
+    def check(self, stage=None):
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded{f' in {stage}' if stage else ''}")
+
+    def mark_incomplete(self, stage):
+        if stage not in self.incomplete:
+            self.incomplete.append(stage)
+
+    def mark_over_budget(self, stage):
+        if stage not in self.over_budget:
+            self.over_budget.append(stage)
+
+    @property
+    def flagged(self):
+        """True if the result needs annotating (and so must not be cached)"""
+        return bool(self.incomplete or self.over_budget)
+
+    def annotate(self, result):
+        """Flag a result dict as partial if any stage ran out of time, and list stages over budget"""
+        if self.incomplete:
+            result['partial'] = True
+            result['incomplete'] = list(self.incomplete)
+            result.setdefault('warnings', []).extend(f"{stage} incomplete" for stage in self.incomplete)
+        if self.over_budget:
+            result['over_budget'] = list(self.over_budget)
+            result.setdefault('warnings', []).extend(f"{stage} over budget" for stage in self.over_budget)
+        return result
+
+
+_current = ContextVar('deadline', default=None)
+
+
+def current_deadline():
+    """Deadline of the request being served, or None outside a deadline scope"""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def run_stage(stage, fn, *args, fallback=None, deadline=None, **kwargs):
+    """Run one pipeline stage under the current deadline
+
+    Returns ``fallback`` (and marks the stage incomplete) if the stage is
+    reached with no time left or times out; a stage that finishes over its
+    budget keeps its value but is marked over budget and counted as an overrun.
+    """
+    deadline = deadline or current_deadline()
+    if deadline is None:
+        return fn(*args, **kwargs)
+    stats = deadline.stats
+
+    if deadline.expired:
+        deadline.mark_incomplete(stage)
+        if stats:
+            stats.record(stage, 'skipped')
+        return fallback
+
+    start = time.monotonic()
+    try:
+        value = fn(*args, **kwargs)
+    except TIMEOUT_ERRORS:
+        deadline.mark_incomplete(stage)
+        if stats:
+            stats.record(stage, 'timeouts', time.monotonic() - start)
+        return fallback
+
+    elapsed = time.monotonic() - start
+    over_budget = elapsed > deadline.budgets.get(stage, float('inf'))
+    if over_budget:
+        deadline.mark_over_budget(stage)
+    if stats:
+        stats.record(stage, 'overruns' if over_budget else 'completed', elapsed)
+    return value
+
+
+class DeadlineStats:
+    """Thread-safe per-stage outcome counters, for capacity planning"""
+
+    OUTCOMES = ('completed', 'overruns', 'timeouts', 'skipped')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.requests = 0
+        self.partial = 0
+        self.over_budget = 0
+        self.deadline_exceeded = 0
+        self.timed_out = 0
+
+    def record(self, stage, outcome, elapsed=0.0):
+        with self._lock:
+            counts = self.stages.get(stage)
+            if counts is None:
+                counts = self.stages[stage] = dict.fromkeys(self.OUTCOMES, 0)
+                counts['seconds'] = 0.0
+            counts[outcome] += 1
+            counts['seconds'] += elapsed
+
+    def record_request(self, deadline):
+        with self._lock:
+            self.requests += 1
+            if deadline.incomplete:
+                self.partial += 1
+            if deadline.over_budget:
+                self.over_budget += 1
+            if deadline.expired:
+                self.deadline_exceeded += 1
+
+    def record_timeout(self):
+        """A request was answered 504 because its deadline passed before the agent returned"""
+        with self._lock:
+            self.timed_out += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'partial': self.partial,
+                'over_budget': self.over_budget,
+                'deadline_exceeded': self.deadline_exceeded,
+                'timed_out': self.timed_out,
+                'stages': {
+                    stage: {**counts, 'seconds': round(counts['seconds'], 3)}
+                    for stage, counts in self.stages.items()
+                },
+            }
@@ -1,12 +1,21 @@
 """
 Simple Drug Repurposing Demo for Judges
-No complex dependencies - Pure Streamlit demo with mock data
+No complex dependencies - Pure Streamlit demo with mock data, or backed by
+the live API (api.py) when "Live API" is selected in the sidebar
+
+    DEMO_MODE=live DEMO_API_URL=http://localhost:8000 streamlit run demo_simple.py
 """
+import os
 import streamlit as st
 import pandas as pd
 import json
+import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
+API_URL = os.getenv("DEMO_API_URL", "http://localhost:8000")
+DEMO_MODE = os.getenv("DEMO_MODE", "mock")
+
 # Configure page
 st.set_page_config(
     page_title="Drug Repurposing AI Demo",
@@ -79,6 +88,78 @@ REPURPOSING_RESULTS = {
     ]
 }
 
+
+
+# Live API client: one pooled session, responses memoized per drug + thresholds
+@st.cache_resource
+def get_session():
+    """Keep-alive connection pool shared across reruns and browser sessions"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=16, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_catalog(api_url):
+    """{name: {'approved_for', 'side_effects'}} for every drug in the API catalog"""
+    drugs = {}
+    # Page by rows received, not len(drugs): duplicate names collapse in the dict
+    offset = 0
+    while True:
+        response = get_session().get(
+            f"{api_url}/api/catalog", params={"limit": 1000, "offset": offset}, timeout=30
+        )
+        response.raise_for_status()
+        page = response.json()
+        for drug in page["drugs"]:
+            drugs[drug["name"]] = {
+                "side_effects": drug.get("sideEffects") or [],
+                "approved_for": drug.get("approvedFor") or "Unknown"
+            }
+        offset += len(page["drugs"])
+        if not page["drugs"] or offset >= page["count"]:
+            return drugs
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_analysis(api_url, drug_name, similarity_threshold, risk_tolerance):
+    """POST /api/analyze, cached by drug and thresholds"""
+    response = get_session().post(f"{api_url}/api/analyze", json={
+        "drug_name": drug_name,
+        "similarity_threshold": similarity_threshold,
+        "risk_tolerance": risk_tolerance
+    }, timeout=120)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_evidence(api_url, drug_name, disease_name):
+    """POST /api/evidence, cached per drug-disease pair"""
+    response = get_session().post(f"{api_url}/api/evidence", json={
+        "drug_name": drug_name,
+        "disease_name": disease_name
+    }, timeout=60)
+    response.raise_for_status()
+    return response.json()["evidence"]
+
+
+def to_display_result(candidate):
+    """Map an /api/analyze candidate onto the fields the panels below show"""
+    driving_effect = candidate.get("driving_effect") or candidate.get("matched_side_effects") or candidate.get("side_effect") or ""
+    evidence = candidate.get("evidence") or candidate.get("evidence_summary") or ""
+    return {
+        "disease": candidate.get("disease") or candidate.get("disease_name", "Unknown"),
+        "confidence": float(candidate.get("confidence", candidate.get("composite_score", candidate.get("score", 0.0)))),
+        "driving_effect": ", ".join(driving_effect) if isinstance(driving_effect, list) else str(driving_effect),
+        "evidence": evidence if isinstance(evidence, str) else json.dumps(evidence),
+        "patent_status": candidate.get("patent_status", "Unknown"),
+        "rationale": candidate.get("rationale") or candidate.get("explanation", "")
+    }
+
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -150,6 +231,26 @@ with st.expander("ℹ️ How This Works (For Judges)", expanded=False):
     - → Repurpose Metformin for cancer! ✓ (Now in clinical trials)
     """)
 
+# Data source
+with st.sidebar:
+    st.header("🔌 Data Source")
+    live_mode = st.radio("Mode", ["Mock data", "Live API"], index=1 if DEMO_MODE == "live" else 0) == "Live API"
+    if live_mode:
+        api_url = st.text_input("API URL", value=API_URL).rstrip("/")
+        similarity_threshold = st.slider("Similarity threshold", 0.0, 1.0, 0.65, 0.05)
+        risk_tolerance = st.slider("Risk tolerance", 0.0, 1.0, 0.5, 0.05)
+        if st.button("🔄 Refresh cached results"):
+            st.cache_data.clear()
+
+if live_mode:
+    try:
+        drugs_data = fetch_catalog(api_url)
+    except requests.RequestException as e:
+        st.error(f"Could not load the drug catalog from {api_url}: {e}")
+        st.stop()
+else:
+    drugs_data = DRUGS_DATA
+
 # Panel 1: Drug Selection
 st.header("🎯 Step 1: Select Drug")
 col1, col2 = st.columns([2, 1])
@@ -157,53 +258,52 @@ col1, col2 = st.columns([2, 1])
 with col1:
     selected_drug = st.selectbox(
         "Choose a drug to analyze:",
-        options=list(DRUGS_DATA.keys()),
+        options=list(drugs_data.keys()),
         help="Real drugs with documented side effects"
     )
 
 with col2:
-    st.metric("Current Use", DRUGS_DATA[selected_drug]["approved_for"])
+    st.metric("Current Use", drugs_data[selected_drug]["approved_for"])
 
 # Show drug profile
 st.subheader(f"📋 {selected_drug} Profile")
-st.info(f"**Known Side Effects:** {', '.join(DRUGS_DATA[selected_drug]['side_effects'])}")
+st.info(f"**Known Side Effects:** {', '.join(drugs_data[selected_drug]['side_effects'])}")
 
 # Analysis button
+# Remember what was analyzed, so widget changes further down rerun against the same (cached) results
 if st.button("🚀 Run AI Repurposing Analysis", type="primary", use_container_width=True):
     st.session_state.analysis_run = True
+    st.session_state.analysis_params = (
+        (selected_drug, similarity_threshold, risk_tolerance) if live_mode else (selected_drug,)
+    )
 
 # Panel 2: Results
 if st.session_state.get('analysis_run'):
     st.markdown("---")
     st.header("📊 Step 2: AI Discovery Results")
     
-    # Simulate processing
-    with st.spinner("🤖 AI Agents Working: Analyzing side effects → Matching diseases → Gathering evidence..."):
-        import time
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        agents = [
-            "Side-Effect Extraction Agent",
-            "Biomedical NLP Agent (BioBERT)",
-            "Disease Matching Agent",
-            "Evidence Retrieval Agent",
-            "Patent & IP Agent",
-            "Scoring & Ranking Agent"
-        ]
-        
-        for i, agent in enumerate(agents):
-            status_text.text(f"✓ {agent} completed")
-            progress_bar.progress((i + 1) / len(agents))
-            time.sleep(0.3)
-        
-        status_text.text("✓ Analysis Complete!")
-        time.sleep(0.5)
+    # Get results
+    params = st.session_state.analysis_params
+    selected_drug = params[0]
+    if live_mode and len(params) == 3:
+        try:
+            with st.spinner("🤖 AI Agents Working: Analyzing side effects → Matching diseases → Gathering evidence..."):
+                analysis = fetch_analysis(api_url, *params)
+        except requests.RequestException as e:
+            st.error(f"Analysis request failed: {e}")
+            st.stop()
+        candidates = analysis.get("results")
+        if candidates is None:
+            candidates = analysis.get("candidates", [])
+        results = [to_display_result(c) for c in candidates]
+    else:
+        results = REPURPOSING_RESULTS.get(selected_drug, [])
     
-    st.success("✓ Analysis Complete! Found repurposing opportunities:")
+    if not results:
+        st.warning(f"No repurposing opportunities found for {selected_drug}.")
+        st.stop()
     
-    # Get results
-    results = REPURPOSING_RESULTS[selected_drug]
+    st.success("✓ Analysis Complete! Found repurposing opportunities:")
     
     # Summary metrics
     col1, col2, col3 = st.columns(3)
@@ -278,6 +378,12 @@ if st.session_state.get('analysis_run'):
         
         st.markdown("#### 📚 Evidence Base")
         st.success(selected_data['evidence'])
+        if live_mode:
+            try:
+                with st.expander("Detailed evidence"):
+                    st.json(fetch_evidence(api_url, selected_drug, selected_result))
+            except requests.RequestException as e:
+                st.error(f"Evidence request failed: {e}")
     
     with col2:
         st.markdown("#### ⚖️ Patent Status")
@@ -337,8 +443,9 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("### 📊 Demo Stats")
-    st.metric("Drugs Analyzed", "3")
-    st.metric("Opportunities Found", "6")
+    st.metric("Drugs Available", len(drugs_data))
+    if not live_mode:
+        st.metric("Opportunities Found", sum(len(r) for r in REPURPOSING_RESULTS.values()))
     st.metric("Success Rate", "100%")
     
     st.markdown("---")
@@ -0,0 +1,230 @@
+"""
+Result Export
+Streaming CSV / NDJSON / Parquet encoders for analysis results.
+
+Each encoder consumes an iterator of (drug_name, result) pairs one drug at a
+time and yields encoded chunks, so a portfolio-wide export never holds more
+than one drug's results (or one Parquet row group) in memory.
+
+A drug whose analysis failed (result ``{'error': ...}``) is exported as a
+single row with an empty rank and the message in the ``error`` column, so a
+partial export is never mistaken for a complete one.
+"""
+import csv
+import io
+import json
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Leading columns of every exported row
+BASE_COLUMNS = ['drug', 'rank', 'error']
+# Parquet column holding (as JSON) fields that do not fit the file's schema
+EXTRA_COLUMN = 'extra'
+
+
+def result_rows(drug_name, result):
+    """Flatten one analysis result into export rows (one per candidate, or one error row)"""
+    if result.get('error'):
+        yield {'drug': drug_name, 'rank': None, 'error': result['error']}
+        return
+    candidates = result.get('results')
+    if candidates is None:
+        candidates = result.get('candidates', [])
+    for rank, candidate in enumerate(candidates, 1):
+        row = {'drug': drug_name, 'rank': rank, 'error': None}
+        _flatten(candidate, row)
+        yield row
+
+
+def _flatten(value, row, prefix=''):
+    for key, item in value.items():
+        name = f"{prefix}{key}"
+        if isinstance(item, dict):
+            _flatten(item, row, name + '.')
+        elif isinstance(item, (list, tuple)):
+            row[name] = '; '.join(str(v) for v in item)
+        else:
+            row[name] = item
+
+
+def stream_ndjson(results):
+    for drug_name, result in results:
+        if result.get('error'):
+            yield json.dumps({'drug': drug_name, 'error': result['error']}) + '\n'
+            continue
+        lines = [json.dumps(row, default=str) for row in result_rows(drug_name, result)]
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+
+def stream_csv(results, columns=None):
+    """CSV with a header from ``columns`` or the first candidate row; unknown later keys are dropped
+
+    The ``drug`` and ``error`` columns are always included, so failed drugs stay
+    visible. Error rows seen before the header is known are held back until it is.
+    """
+    if columns:
+        columns = list(columns)
+        if 'drug' not in columns:
+            columns.insert(0, 'drug')
+        if 'error' not in columns:
+            columns.append('error')
+    buffer = io.StringIO()
+    writer = None
+    held = []
+    for drug_name, result in results:
+        for row in result_rows(drug_name, result):
+            if writer is None:
+                if row['error'] and not columns:
+                    held.append(row)
+                    continue
+                fieldnames = columns or BASE_COLUMNS + [k for k in row if k not in BASE_COLUMNS]
+                writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(held)
+                held.clear()
+            writer.writerow(row)
+        chunk = buffer.getvalue()
+        if chunk:
+            yield chunk
+            buffer.seek(0)
+            buffer.truncate()
+    if writer is None:
+        writer = csv.DictWriter(buffer, fieldnames=columns or BASE_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(held)
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each write"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _parquet_schema(batch, columns=None):
+    """Schema for a Parquet export: base columns, then candidate columns typed from ``batch``
+
+    Columns with no values yet (null type) become strings, so later values
+    still fit. Without explicit ``columns``, an ``extra`` column holds (as
+    JSON) any key or value the schema cannot, instead of dropping it.
+    """
+    import pyarrow as pa
+
+    keys = list(columns) if columns else dict.fromkeys(key for row in batch for key in row)
+    keys = [key for key in keys if key not in BASE_COLUMNS and key != EXTRA_COLUMN]
+    inferred = pa.Table.from_pydict({key: [row.get(key) for row in batch] for key in keys}).schema
+    fields = [('drug', pa.string()), ('rank', pa.int64()), ('error', pa.string())]
+    fields += [(field.name, pa.string() if pa.types.is_null(field.type) else field.type) for field in inferred]
+    if not columns:
+        fields.append((EXTRA_COLUMN, pa.string()))
+    return pa.schema(fields)
+
+
+def _parquet_table(batch, schema):
+    """Table of ``batch`` under a fixed schema; misfits go to the extra column if there is one"""
+    import pyarrow as pa
+
+    has_extra = EXTRA_COLUMN in schema.names
+    extras = [{} for _ in batch]
+    arrays = []
+    for field in schema:
+        if field.name == EXTRA_COLUMN:
+            continue
+        values = [row.get(field.name) for row in batch]
+        if pa.types.is_string(field.type):
+            values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+        try:
+            arrays.append(pa.array(values, type=field.type))
+            continue
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        # Rare: a value of another type than the column's; convert row by row
+        fitted = []
+        for i, value in enumerate(values):
+            try:
+                pa.array([value], type=field.type)
+                fitted.append(value)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                fitted.append(None)
+                extras[i][field.name] = value
+        arrays.append(pa.array(fitted, type=field.type))
+    if has_extra:
+        known = set(schema.names)
+        for row, extra in zip(batch, extras):
+            extra.update((key, value) for key, value in row.items() if key not in known)
+        arrays.append(pa.array([json.dumps(extra, default=str) if extra else None for extra in extras], type=pa.string()))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def stream_parquet(results, columns=None, rows_per_group=10000):
+    """Parquet written one row group at a time
+
+    The schema is fixed by ``columns`` or, by default, by the first group that
+    holds candidate rows (error rows before it are held back). Later values
+    that do not fit are kept in the ``extra`` column rather than failing
+    mid-stream or being dropped.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    batch = []
+
+    def flush(final=False):
+        nonlocal writer
+        if writer is None:
+            if not final and all(row['error'] for row in batch):
+                return b''
+            schema = _parquet_schema(batch, columns)
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_table(_parquet_table(batch, writer.schema))
+        batch.clear()
+        return sink.drain()
+
+    for drug_name, result in results:
+        batch.extend(result_rows(drug_name, result))
+        if len(batch) >= rows_per_group:
+            chunk = flush()
+            if chunk:
+                yield chunk
+
+    if batch:
+        yield flush(final=True)
+    if writer is None:
+        writer = pq.ParquetWriter(sink, _parquet_schema([], columns))
+    writer.close()
+    yield sink.drain()
+
+
+def stream_export(results, fmt, columns=None):
+    if fmt == 'csv':
+        return stream_csv(results, columns)
+    if fmt == 'ndjson':
+        return stream_ndjson(results)
+    if fmt == 'parquet':
+        return stream_parquet(results, columns)
+    raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(FORMATS)})")
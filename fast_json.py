@@ -0,0 +1,64 @@
+"""
+Fast JSON Responses
+orjson-backed encoding for API payloads. numpy arrays and scalars (scores,
+similarity rows) are encoded natively instead of going through FastAPI's
+recursive jsonable_encoder.
+
+Falls back to the standard json module when orjson is not installed, so the
+API still runs with only the base requirements.
+"""
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def _default(value):
+    """Types neither encoder handles natively"""
+    if hasattr(value, 'tolist'):  # numpy arrays (non-contiguous / object dtype)
+        return value.tolist()
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    ENCODER = 'orjson'
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content):
+        """Encode to compact UTF-8 JSON bytes"""
+        return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    ENCODER = 'json'
+
+    def dumps(content):
+        """Encode to compact UTF-8 JSON bytes"""
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+        ).encode('utf-8')
+
+    loads = json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps(); bytes content is sent as an already-encoded body
+
+    Returning an instance directly from an endpoint also skips FastAPI's
+    jsonable_encoder pass over the payload.
+    """
+
+    def render(self, content):
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        return dumps(content)
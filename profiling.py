@@ -0,0 +1,369 @@
+"""
+Request Profiling
+On-demand profiles of single requests, plus a low-rate background sampler
+that aggregates hotspots across all traffic.
+
+A request to a profiled path (/api/analyze, /api/evidence) opts in with
+``?profile=cprofile|sampling`` or an ``X-Profile`` header and must carry the
+configured ``X-Profile-Token``. The request runs normally, and the response
+body is replaced by the profile as a download:
+
+    cprofile  pstats file (.prof): python -m pstats, snakeviz
+    sampling  collapsed stacks (.collapsed): flamegraph.pl, speedscope
+
+The agent call of a request runs in a threadpool worker, so the profile is
+recorded in that thread: the endpoint wraps its blocking work in
+``profile_worker()``, which starts the request's profiler there. If the
+request times out first, the capture waits up to ``max_wait`` seconds for the
+worker to finish, so the profile shows where the slow request spent its
+time. If the worker is still running after that, a sampling capture returns
+the stacks collected so far (``X-Profile-Truncated: true``), and a cProfile
+capture, which cannot be stopped from another thread, returns 504. One
+capture runs at a time.
+"""
+import cProfile
+import hmac
+import marshal
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+
+PROFILERS = ('cprofile', 'sampling')
+
+# Leaf frames of threads that are blocked waiting, not working
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+    ('socket.py', 'accept'),
+}
+
+
+class _WorkerCapture:
+    """Hands a request's profiler to the worker thread that runs its blocking call"""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.started = False
+        self.finished = threading.Event()
+
+
+_active_capture = ContextVar('active_capture', default=None)
+
+
+@contextmanager
+def profile_worker():
+    """Profile the enclosed block if the current request is being captured
+
+    Call from the thread doing the work; a no-op for requests that are not
+    profiled. The request context reaches threadpool workers through
+    run_in_threadpool. Only the first block of a request is profiled.
+    """
+    capture = _active_capture.get()
+    if capture is None or capture.started:
+        yield
+        return
+    capture.started = True
+    capture.profiler.start()
+    try:
+        yield
+    finally:
+        capture.profiler.stop()
+        capture.finished.set()
+
+
+def check_token(provided, expected):
+    """Constant-time token comparison; profiling is closed when no token is configured"""
+    if not expected or not provided:
+        return False
+    return hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8'))
+
+
+def _frame_label(code):
+    return f"{Path(code.co_filename).name}:{code.co_name}"
+
+
+def collapse_stack(frame):
+    """Root-to-leaf ';'-joined frame labels, or None if the leaf is an idle wait"""
+    if (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in IDLE_FRAMES:
+        return None
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def format_collapsed(stacks):
+    """Counter of collapsed stacks as flamegraph.pl input text"""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class CProfileCapture:
+    """Deterministic cProfile of the calling thread"""
+
+    extension = 'prof'
+    media_type = 'application/octet-stream'
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def dump(self):
+        # Same bytes Profile.dump_stats() writes; load with pstats.Stats(path)
+        self.profiler.create_stats()
+        return marshal.dumps(self.profiler.stats)
+
+
+class StackSampler:
+    """Samples one thread's stack every ``interval`` seconds from a helper thread
+
+    With no ``thread_id`` the sampler follows the thread that calls start().
+    """
+
+    extension = 'collapsed'
+    media_type = 'text/plain; charset=utf-8'
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = collapse_stack(frame) if frame is not None else None
+            if stack:
+                self.stacks[stack] += 1
+
+    def dump(self):
+        return format_collapsed(self.stacks).encode('utf-8')
+
+
+class CaptureLimiter:
+    """At most ``max_per_minute`` captures in any sliding 60s window"""
+
+    def __init__(self, max_per_minute):
+        self.max_per_minute = max_per_minute
+        self._starts = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._starts and now - self._starts[0] >= 60:
+                self._starts.popleft()
+            if len(self._starts) >= self.max_per_minute:
+                return False
+            self._starts.append(now)
+            return True
+
+
+class ProfileCapturer:
+    """Access control, rate limiting and counters for on-demand captures"""
+
+    def __init__(self, token, max_per_minute=6, sample_interval=0.005):
+        self.token = token
+        self.limiter = CaptureLimiter(max_per_minute)
+        self.sample_interval = sample_interval
+        self.captures = 0
+        self.rejected = 0
+        self._busy = threading.Lock()
+
+    def acquire(self, mode, token):
+        """Claim the capture slot; returns (status, detail) instead if the capture may not run"""
+        if not check_token(token, self.token):
+            error = 403, 'Invalid or missing X-Profile-Token'
+        elif mode not in PROFILERS:
+            error = 422, f"profile must be one of: {', '.join(PROFILERS)}"
+        elif not self._busy.acquire(blocking=False):
+            error = 429, 'Another profile capture is running'
+        elif not self.limiter.acquire():
+            self._busy.release()
+            error = 429, 'Profile capture rate limit reached'
+        else:
+            return None
+        self.rejected += 1
+        return error
+
+    def release(self):
+        self.captures += 1
+        self._busy.release()
+
+    def profiler(self, mode):
+        """Profiler for the thread that later starts it (see profile_worker)"""
+        if mode == 'cprofile':
+            return CProfileCapture()
+        return StackSampler(interval=self.sample_interval)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware returning a profile of flagged requests to selected paths"""
+
+    def __init__(self, app, capturer, paths=('/api/analyze', '/api/evidence'), max_wait=300.0):
+        self.app = app
+        self.capturer = capturer
+        self.paths = set(paths)
+        # Longest wait for a timed-out request's worker before giving up on it
+        self.max_wait = max_wait
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        mode = headers.get('x-profile') or (query.get('profile') or [None])[0]
+        if not mode:
+            await self.app(scope, receive, send)
+            return
+
+        mode = mode.lower()
+        error = self.capturer.acquire(mode, headers.get('x-profile-token'))
+        if error:
+            await JSONResponse({'detail': error[1]}, status_code=error[0])(scope, receive, send)
+            return
+        try:
+            await self._profile(mode, scope, receive, send)
+        finally:
+            self.capturer.release()
+
+    async def _profile(self, mode, scope, receive, send):
+        status = 500
+
+        async def discard_send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+        profiler = self.capturer.profiler(mode)
+        capture = _WorkerCapture(profiler)
+        start = time.perf_counter()
+        token = _active_capture.set(capture)
+        try:
+            await self.app(scope, receive, discard_send)
+        finally:
+            _active_capture.reset(token)
+        truncated = False
+        if capture.started and not capture.finished.is_set():
+            # Answered (504) before its worker returned; dump only once the profiler has stopped
+            if not await run_in_threadpool(capture.finished.wait, self.max_wait):
+                if not isinstance(profiler, StackSampler):
+                    response = JSONResponse({'detail': (
+                        f"Profiled request still running after {self.max_wait:g}s; "
+                        f"{mode} cannot be stopped from another thread"
+                    )}, status_code=504)
+                    await response(scope, receive, send)
+                    return
+                profiler.stop()
+                truncated = True
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        name = scope['path'].rstrip('/').rsplit('/', 1)[-1]
+        filename = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.{profiler.extension}"
+        response = Response(profiler.dump(), media_type=profiler.media_type, headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Profile-Status': str(status),
+            'X-Profile-Duration-Ms': f"{duration_ms:.1f}",
+            'X-Profile-Truncated': 'true' if truncated else 'false',
+        })
+        await response(scope, receive, send)
+
+
+class HotspotSampler:
+    """Daemon thread sampling every thread's stack at a low, fixed rate
+
+    Samples are aggregated into collapsed stacks (bounded to ``max_stacks``
+    distinct entries) so hotspots across all traffic can be inspected without
+    per-request overhead. Idle waits are skipped.
+    """
+
+    def __init__(self, interval=0.1, max_stacks=5000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.stacks = Counter()
+        self.samples = 0
+        self.overflow = 0
+        self.started_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hotspot-sampler', daemon=True)
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = [collapse_stack(frame) for thread_id, frame in frames.items() if thread_id != own_id]
+            del frames
+            with self._lock:
+                for stack in stacks:
+                    if stack is None:
+                        continue
+                    if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                        self.stacks[stack] += 1
+                    else:
+                        self.overflow += 1
+                    self.samples += 1
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+            self.overflow = 0
+
+    def collapsed(self):
+        with self._lock:
+            return format_collapsed(self.stacks)
+
+    def top(self, n=20):
+        """Functions ranked by samples spent in them (self) and under them (total)"""
+        own, total = Counter(), Counter()
+        with self._lock:
+            for stack, count in self.stacks.items():
+                frames = stack.split(';')
+                own[frames[-1]] += count
+                for frame in set(frames):
+                    total[frame] += count
+            samples = self.samples
+        return [
+            {
+                'function': function,
+                'self_samples': count,
+                'self_share': round(count / samples, 4) if samples else 0.0,
+                'total_samples': total[function],
+            }
+            for function, count in own.most_common(n)
+        ]
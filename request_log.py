@@ -0,0 +1,137 @@
+"""
+Request Log Capture
+ASGI middleware that appends sampled API requests (body + timing) to a
+rotating JSONL log without blocking the event loop.
+
+Each line is a replayable record:
+    {"ts": 1734350000.12, "method": "POST", "path": "/api/analyze", "query": "",
+     "body": {...}, "status": 200, "duration_ms": 812.4}
+
+Replay with scripts/replay_requests.py or benchmarks/bench_api.py --workload.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from pathlib import Path
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Message is already a JSON line; skip QueueHandler's formatting copy
+        return record
+
+    def enqueue(self, record):
+        """Queue the record; returns False if it was dropped"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+
+class RequestLogWriter:
+    """Background JSONL writer with size-based rotation"""
+
+    def __init__(self, path, max_bytes, backup_count, queue_size):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        file_handler.setFormatter(logging.Formatter('%(message)s'))
+
+        self.handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.listener = logging.handlers.QueueListener(self.handler.queue, file_handler)
+        self.written = 0
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    def start(self):
+        self.listener.start()
+
+    def stop(self):
+        """Flush queued records and stop the writer thread"""
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def write(self, record):
+        # Enqueue directly rather than through a Logger so drops are visible here
+        message = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        if self.handler.enqueue(logging.makeLogRecord({'msg': message, 'levelno': logging.INFO, 'levelname': 'INFO'})):
+            self.written += 1
+
+
+class RequestLogMiddleware:
+    """Pure ASGI middleware capturing sampled HTTP requests to a RequestLogWriter"""
+
+    def __init__(self, app, writer, sample_rate=1.0, max_body_bytes=64 * 1024, path_prefix='/api/'):
+        self.app = app
+        self.writer = writer
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http'
+                or not scope['path'].startswith(self.path_prefix)
+                or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        size = 0
+        status = 500
+
+        async def capture_receive():
+            nonlocal size
+            message = await receive()
+            if message['type'] == 'http.request' and size <= self.max_body_bytes:
+                body = message.get('body', b'')
+                size += len(body)
+                chunks.append(body)
+            return message
+
+        async def capture_send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        ts = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            self.writer.write({
+                'ts': round(ts, 6),
+                'method': scope['method'],
+                'path': scope['path'],
+                'query': scope.get('query_string', b'').decode('latin-1'),
+                'body': self._decode_body(b''.join(chunks), size),
+                'status': status,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    def _decode_body(self, raw, size):
+        if not raw:
+            return None
+        if size > self.max_body_bytes:
+            return {'_truncated': True, '_bytes': size}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {'_raw': raw.decode('utf-8', errors='replace')}
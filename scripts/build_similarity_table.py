@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Drug Similarity Table Builder
+Precomputes the top-k side-effect-profile neighbours of every drug (all pairs)
+and writes them as a CSV neighbour table.
+
+Rows are processed in blocks, one sparse product per block, so memory stays
+bounded at block_size x drugs scores regardless of catalog size.
+
+Usage:
+    python scripts/build_similarity_table.py --metric cosine --k 20
+    python scripts/build_similarity_table.py --metric jaccard --output data/neighbors_jaccard.csv
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+from tqdm import tqdm
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from catalog import DRUG_LIST_PATH, DrugCatalog  # noqa: E402
+from side_effect_matrix import MATRIX_PATH, METRICS, SideEffectMatrix  # noqa: E402
+
+OUTPUT_DIR = Path(__file__).parent.parent / 'data'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the all-pairs drug side-effect neighbour table")
+    parser.add_argument('--metric', choices=METRICS, default='cosine')
+    parser.add_argument('--k', type=int, default=20, help="Neighbours per drug")
+    parser.add_argument('--min-score', type=float, default=0.0, help="Drop neighbours at or below this score")
+    parser.add_argument('--block-size', type=int, default=256, help="Rows per sparse product")
+    parser.add_argument('--output', help="CSV path (default: data/drug_neighbors_<metric>.csv)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("DRUG SIMILARITY TABLE")
+    print("=" * 60)
+
+    if not DRUG_LIST_PATH.exists():
+        print("❌ drugList.json not found! Run generate_drug_list.py first.")
+        sys.exit(1)
+
+    catalog = DrugCatalog.load(DRUG_LIST_PATH)
+    matrix = SideEffectMatrix.for_catalog(catalog, MATRIX_PATH)
+    print(f"📊 Matrix: {matrix.shape[0]} drugs x {matrix.shape[1]} terms ({matrix.matrix.nnz} entries)")
+    print(f"📐 Metric: {args.metric}, k={args.k}")
+
+    output = Path(args.output) if args.output else OUTPUT_DIR / f"drug_neighbors_{args.metric}.csv"
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    written = 0
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['drug', 'rank', 'neighbor', 'score'])
+        for block_start in tqdm(range(0, len(matrix), args.block_size), desc="Computing neighbours"):
+            rows = range(block_start, min(block_start + args.block_size, len(matrix)))
+            for row, neighbors in zip(rows, matrix.top_k(rows, args.k, args.metric, args.min_score)):
+                for rank, (j, score) in enumerate(neighbors, 1):
+                    writer.writerow([matrix.drugs[row], rank, matrix.drugs[j], f"{score:.6f}"])
+                    written += 1
+
+    print(f"✅ Saved {written} neighbour pairs to: {output}")
+    print(f"⏱️  {time.perf_counter() - start:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
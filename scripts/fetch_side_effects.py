@@ -8,27 +8,44 @@ Rate Limit: 240 req/min (free) or 1,000 req/min (with API key)
 """
 
 import requests
-import json
+import os
+import re
 import time
+import pandas as pd
 from pathlib import Path
 from tqdm import tqdm
 import sys
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from catalog import DRUG_LIST_PATH, DrugCatalog  # noqa: E402
+from side_effect_matrix import MATRIX_PATH, SideEffectMatrix  # noqa: E402
+
 # OpenFDA API configuration
-OPENFDA_BASE = "https://api.fda.gov/drug/event.json"
+# Override OPENFDA_BASE to point at scripts/mock_upstream.py for offline runs
+OPENFDA_BASE = os.environ.get("OPENFDA_BASE", "https://api.fda.gov/drug/event.json")
 API_KEY = ""  # Get free key from: https://open.fda.gov/apis/authentication/
 
 # Rate limiting
 REQUESTS_PER_MINUTE = 240 if not API_KEY else 1000
 DELAY_BETWEEN_REQUESTS = 60 / REQUESTS_PER_MINUTE
 
-def fetch_side_effects(drug_name, max_results=10):
-    """Fetch top side effects for a drug from OpenFDA"""
+# Side effects listed per drug in drugList.json
+MAX_SIDE_EFFECTS = 10
+# Term/count pairs kept per drug in sideEffectMatrix.npz (OpenFDA allows up to 1000)
+COUNT_DEPTH = int(os.environ.get("OPENFDA_COUNT_DEPTH", 100))
+# Names tried per ingredient group before falling back to generic side effects
+MAX_LOOKUPS_PER_GROUP = int(os.environ.get("OPENFDA_MAX_LOOKUPS_PER_GROUP", 3))
+
+def fetch_side_effect_counts(drug_name, depth=COUNT_DEPTH):
+    """Fetch the top side effects for a drug from OpenFDA with their report counts
+
+    Returns ([{'term': ..., 'count': ...}, ...], success), heaviest first.
+    """
     try:
         params = {
             'search': f'patient.drug.medicinalproduct:"{drug_name}"',
             'count': 'patient.reaction.reactionmeddrapt.exact',
-            'limit': max_results
+            'limit': depth
         }
         
         if API_KEY:
@@ -39,17 +56,18 @@ def fetch_side_effects(drug_name, max_results=10):
         if response.status_code == 200:
             data = response.json()
             if 'results' in data:
-                # Extract top side effects
-                side_effects = [item['term'] for item in data['results'][:max_results]]
-                return side_effects, True
+                # Keep the term -> count distribution
+                counts = [{'term': item['term'], 'count': item['count']} for item in data['results'][:depth]]
+                return counts, True
         elif response.status_code == 404:
             # No data found for this drug
             return [], True
         elif response.status_code == 429:
             # Rate limit exceeded
-            print(f"\n⚠️  Rate limit exceeded, waiting 60 seconds...")
-            time.sleep(60)
-            return fetch_side_effects(drug_name, max_results)
+            wait = int(response.headers.get('Retry-After', 60))
+            print(f"\n⚠️  Rate limit exceeded, waiting {wait} seconds...")
+            time.sleep(wait)
+            return fetch_side_effect_counts(drug_name, depth)
         else:
             return [], False
             
@@ -62,26 +80,206 @@ def fetch_side_effects(drug_name, max_results=10):
     
     return [], False
 
+def fetch_side_effects(drug_name, max_results=MAX_SIDE_EFFECTS):
+    """Fetch top side effects for a drug from OpenFDA"""
+    counts, success = fetch_side_effect_counts(drug_name, max_results)
+    return [item['term'] for item in counts], success
+
+# Fallback side effects based on drug category
+GENERIC_SIDE_EFFECTS = {
+    "Cardiovascular": ["Dizziness", "Hypotension", "Edema", "Bradycardia"],
+    "Diabetes": ["Hypoglycemia", "Nausea", "Diarrhea", "Weight Changes"],
+    "Pain": ["Nausea", "Dizziness", "Gastrointestinal Upset", "Drowsiness"],
+    "Antibiotic": ["Diarrhea", "Nausea", "Allergic Reaction", "Yeast Infection"],
+    "Antidepressant": ["Nausea", "Sleep Changes", "Weight Changes", "Sexual Dysfunction"],
+    "Anxiolytic": ["Drowsiness", "Dizziness", "Memory Impairment", "Dependence"],
+    "Antipsychotic": ["Sedation", "Weight Gain", "Metabolic Changes", "Movement Disorders"],
+    "GI": ["Headache", "Diarrhea", "Abdominal Pain", "Nausea"],
+    "Respiratory": ["Headache", "Throat Irritation", "Cough", "Tremor"],
+    "Oncology": ["Nausea", "Fatigue", "Hair Loss", "Myelosuppression"],
+    "Corticosteroid": ["Weight Gain", "Mood Changes", "Immunosuppression", "Osteoporosis"],
+    "Neurology": ["Dizziness", "Drowsiness", "Peripheral Edema", "Ataxia"],
+    "Stimulant": ["Insomnia", "Appetite Loss", "Anxiety", "Tachycardia"],
+    "Other": ["Nausea", "Headache", "Dizziness", "Fatigue"]
+}
+
+# Salt / form words that don't change the active ingredient
+SALT_SUFFIXES = {
+    'hydrochloride', 'hcl', 'hydrobromide', 'sodium', 'potassium', 'calcium', 'magnesium',
+    'sulfate', 'sulphate', 'maleate', 'mesylate', 'succinate', 'tartrate', 'besylate',
+    'acetate', 'citrate', 'fumarate', 'phosphate', 'bromide', 'chloride', 'dihydrate',
+    'monohydrate', 'trihydrate', 'anhydrous', 'er', 'xr', 'sr', 'xl', 'extended', 'release',
+}
+
 def get_generic_side_effects(category):
     """Fallback side effects based on drug category"""
-    generic_effects = {
-        "Cardiovascular": ["Dizziness", "Hypotension", "Edema", "Bradycardia"],
-        "Diabetes": ["Hypoglycemia", "Nausea", "Diarrhea", "Weight Changes"],
-        "Pain": ["Nausea", "Dizziness", "Gastrointestinal Upset", "Drowsiness"],
-        "Antibiotic": ["Diarrhea", "Nausea", "Allergic Reaction", "Yeast Infection"],
-        "Antidepressant": ["Nausea", "Sleep Changes", "Weight Changes", "Sexual Dysfunction"],
-        "Anxiolytic": ["Drowsiness", "Dizziness", "Memory Impairment", "Dependence"],
-        "Antipsychotic": ["Sedation", "Weight Gain", "Metabolic Changes", "Movement Disorders"],
-        "GI": ["Headache", "Diarrhea", "Abdominal Pain", "Nausea"],
-        "Respiratory": ["Headache", "Throat Irritation", "Cough", "Tremor"],
-        "Oncology": ["Nausea", "Fatigue", "Hair Loss", "Myelosuppression"],
-        "Corticosteroid": ["Weight Gain", "Mood Changes", "Immunosuppression", "Osteoporosis"],
-        "Neurology": ["Dizziness", "Drowsiness", "Peripheral Edema", "Ataxia"],
-        "Stimulant": ["Insomnia", "Appetite Loss", "Anxiety", "Tachycardia"],
-        "Other": ["Nausea", "Headache", "Dizziness", "Fatigue"]
+    return GENERIC_SIDE_EFFECTS.get(category, GENERIC_SIDE_EFFECTS["Other"])
+
+def normalize_ingredient(name):
+    """Normalized active-ingredient key, e.g. 'Metformin HCl ER' -> 'metformin'
+
+    Only salt/form words trailing a non-salt core word are dropped, so
+    'Losartan Potassium' -> 'losartan' while 'Potassium Chloride' and
+    'Calcium Gluconate' stay distinct ingredients.
+    """
+    words = re.sub(r'[^a-z0-9 ]+', ' ', (name or '').lower()).split()
+    end = len(words)
+    while end > 1 and words[end - 1] in SALT_SUFFIXES:
+        end -= 1
+    if end and words[end - 1] in SALT_SUFFIXES:
+        # Nothing but salt words (e.g. 'Sodium Chloride'): the salt is the ingredient
+        end = len(words)
+    return ' '.join(words[:end])
+
+def lookup_names(group, limit=MAX_LOOKUPS_PER_GROUP):
+    """Names to query for an ingredient group, in order: the core ingredient, then each member
+
+    The core name ('metformin' for 'Metformin HCl') is the likeliest OpenFDA
+    hit, so it always gets the first lookup; a member spelled the same is
+    queried with its catalog spelling.
+    """
+    spellings = {}
+    for drug in group:
+        spellings.setdefault(drug.name.lower(), drug.name)
+    core = normalize_ingredient(group[0].name)
+    keys = dict.fromkeys(([core] if core else []) + [drug.name.lower() for drug in group])
+    return [spellings.get(key, key) for key in keys][:limit]
+
+def group_by_ingredient(drugs):
+    """Group drugs sharing a normalized ingredient or trade-name synonym
+
+    A drug whose trade name matches another drug's name (e.g. Rapamycin /
+    Sirolimus) joins that drug's group. Groups keep catalog order.
+    """
+    parent = {}
+
+    def find(key):
+        while parent.setdefault(key, key) != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    keys = []
+    for drug in drugs:
+        key = normalize_ingredient(drug.name)
+        keys.append(key)
+        find(key)
+        if drug.trade_name:
+            union(key, normalize_ingredient(drug.trade_name))
+
+    groups = {}
+    for drug, key in zip(drugs, keys):
+        groups.setdefault(find(key), []).append(drug)
+    return list(groups.values())
+
+def generic_side_effects_column(categories):
+    """Category fallback for a whole column at once (pandas Series of categories)"""
+    known = categories.where(categories.isin(GENERIC_SIDE_EFFECTS.keys()), "Other")
+    return known.map(GENERIC_SIDE_EFFECTS)
+
+def enrich_catalog(drug_list, fetch=None, delay=None, progress=True, counts=None):
+    """Enrich every drug lacking side effects; returns statistics
+
+    Drugs are fetched once per ingredient group and the result fanned out to
+    all members; if the core ingredient name has no data, the members' own
+    names are tried (see lookup_names). Drugs left without
+    OpenFDA data get their category fallback in a single vectorized pass at
+    the end.
+
+    fetch(name) returns ([{'term', 'count'}, ...], success). Fetched count
+    profiles are stored into ``counts`` ({drug name: profile}) when given.
+    """
+    fetch = fetch or fetch_side_effect_counts
+    counts = {} if counts is None else counts
+    delay = DELAY_BETWEEN_REQUESTS if delay is None else delay
+    start = time.perf_counter()
+
+    stats = {
+        'enriched': 0,
+        'failed': 0,
+        'no_data': 0,
+        'generic': 0,
+        'api_calls': 0,
+        'groups': 0,
+        'pending': 0
     }
-    
-    return generic_effects.get(category, generic_effects["Other"])
+
+    # Skip drugs already enriched
+    pending = [drug for drug in drug_list if not (drug.enriched and drug.side_effect_ids)]
+    stats['enriched'] = len(drug_list) - len(pending)
+    stats['pending'] = len(pending)
+
+    groups = group_by_ingredient(pending)
+    stats['groups'] = len(groups)
+
+    # Outcome per pending drug: 'OpenFDA', 'generic' (no data) or 'failed' (API error)
+    fallback_drugs = []
+    fallback_outcomes = []
+    for group in tqdm(groups, desc="Fetching ingredient groups", disable=not progress):
+        # Try to fetch from OpenFDA, once for the whole group unless a name has no data
+        side_effects, any_success = [], False
+        for name in lookup_names(group):
+            profile, success = fetch(name)
+            side_effects = [item['term'] for item in profile[:MAX_SIDE_EFFECTS]]
+            any_success = any_success or success
+            stats['api_calls'] += 1
+
+            # Rate limiting delay
+            if delay:
+                time.sleep(delay)
+            if side_effects:
+                break
+        
+        for drug in group:
+            if side_effects:
+                counts[drug.name] = profile
+                drug.side_effects = side_effects
+                drug.enriched = True
+                drug.data_source = 'OpenFDA'
+                stats['enriched'] += 1
+            else:
+                fallback_drugs.append(drug)
+                fallback_outcomes.append('generic' if any_success else 'failed')
+
+    if fallback_drugs:
+        # No data found or API error: apply category fallbacks as one column operation
+        frame = pd.DataFrame({
+            'category': [drug.category for drug in fallback_drugs],
+            'outcome': fallback_outcomes
+        })
+        frame['sideEffects'] = generic_side_effects_column(frame['category'])
+        for drug, effects in zip(fallback_drugs, frame['sideEffects']):
+            drug.side_effects = effects
+            drug.enriched = True
+            drug.data_source = 'Generic'
+        outcomes = frame['outcome'].value_counts()
+        stats['generic'] += int(outcomes.get('generic', 0))
+        stats['failed'] += int(outcomes.get('failed', 0))
+
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+def load_existing_counts(drug_list):
+    """Count profiles from a previous run's matrix, for drugs that won't be refetched"""
+    if not MATRIX_PATH.exists():
+        return {}
+    try:
+        matrix = SideEffectMatrix.load(MATRIX_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  Ignoring unreadable {MATRIX_PATH.name}: {e}")
+        return {}
+    counts = {}
+    for drug in drug_list:
+        profile = matrix.counts_for(drug.name)
+        # Rows built from plain side-effect lists carry weight 1.0, not counts
+        if profile and drug.data_source == 'OpenFDA' and max(profile.values()) > 1:
+            counts[drug.name] = [{'term': term, 'count': int(count)} for term, count in profile.items()]
+    return counts
 
 def enrich_drug_list():
     """Main function to enrich drug list with side effects"""
@@ -91,68 +289,35 @@ def enrich_drug_list():
     print()
     
     # Load drug list
-    drug_list_path = Path(__file__).parent.parent / 'src' / 'drugList.json'
+    drug_list_path = DRUG_LIST_PATH
     
     if not drug_list_path.exists():
         print("❌ drugList.json not found! Run generate_drug_list.py first.")
         sys.exit(1)
     
-    with open(drug_list_path, 'r', encoding='utf-8') as f:
-        drug_list = json.load(f)
+    drug_list = DrugCatalog.load(drug_list_path)
+    counts = load_existing_counts(drug_list)
     
     print(f"📊 Loaded {len(drug_list)} drugs")
     print(f"🔑 API Key: {'✅ Configured' if API_KEY else '❌ Not configured (using free tier)'}")
     print(f"⏱️  Rate Limit: {REQUESTS_PER_MINUTE} requests/minute")
     print()
     
-    # Track statistics
-    stats = {
-        'enriched': 0,
-        'failed': 0,
-        'no_data': 0,
-        'generic': 0
-    }
-    
-    # Enrich each drug
+    # Enrich drugs, one OpenFDA call per ingredient group
     print("🔄 Fetching side effects from OpenFDA...")
-    for drug in tqdm(drug_list, desc="Processing drugs"):
-        # Skip if already enriched
-        if drug.get('enriched') and drug.get('sideEffects'):
-            stats['enriched'] += 1
-            continue
-        
-        # Try to fetch from OpenFDA
-        side_effects, success = fetch_side_effects(drug['name'])
-        
-        if side_effects:
-            drug['sideEffects'] = side_effects
-            drug['enriched'] = True
-            drug['dataSource'] = 'OpenFDA'
-            stats['enriched'] += 1
-        elif success and not side_effects:
-            # No data found, use generic
-            drug['sideEffects'] = get_generic_side_effects(drug.get('category', 'Other'))
-            drug['enriched'] = True
-            drug['dataSource'] = 'Generic'
-            stats['generic'] += 1
-        else:
-            # API error, use generic
-            drug['sideEffects'] = get_generic_side_effects(drug.get('category', 'Other'))
-            drug['enriched'] = True
-            drug['dataSource'] = 'Generic'
-            stats['failed'] += 1
-        
-        # Rate limiting delay
-        time.sleep(DELAY_BETWEEN_REQUESTS)
+    stats = enrich_catalog(drug_list, counts=counts)
     
     print()
     print("💾 Saving enriched data...")
     
     # Save enriched data
-    with open(drug_list_path, 'w', encoding='utf-8') as f:
-        json.dump(drug_list, f, indent=2, ensure_ascii=False)
+    drug_list.dump(drug_list_path)
+    matrix = SideEffectMatrix.build(drug_list, counts)
+    matrix.save(MATRIX_PATH)
     
     print(f"✅ Saved to: {drug_list_path}")
+    print(f"✅ Saved {matrix.shape[0]} x {matrix.shape[1]} side-effect count matrix "
+          f"({matrix.matrix.nnz} entries, {len(counts)} drugs with counts) to: {MATRIX_PATH}")
     print()
     
     # Print statistics
@@ -161,13 +326,16 @@ def enrich_drug_list():
     print(f"   OpenFDA Data: {stats['enriched']} ({stats['enriched']/len(drug_list)*100:.1f}%)")
     print(f"   Generic Fallback: {stats['generic']} ({stats['generic']/len(drug_list)*100:.1f}%)")
     print(f"   Errors: {stats['failed']}")
+    print(f"   Network Calls: {stats['api_calls']} for {stats['pending']} drugs needing data "
+          f"in {stats['groups']} ingredient groups")
+    print(f"   Wall Clock: {stats['elapsed']:.1f}s")
     print()
     
     # Sample entries
     print("📋 Sample Enriched Entries:")
-    for drug in drug_list[:5]:
-        effects = ', '.join(drug['sideEffects'][:3])
-        print(f"   • {drug['name']}: {effects}... ({drug.get('dataSource', 'Unknown')})")
+    for drug in drug_list.records[:5]:
+        effects = ', '.join(drug.side_effects[:3])
+        print(f"   • {drug.name}: {effects}... ({drug.data_source or 'Unknown'})")
     
     print()
     print("✨ Next step: Frontend integration complete!")
@@ -9,11 +9,13 @@ Output: drugList.json with ~4,000 approved drugs
 
 import pandas as pd
 import requests
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from catalog import DRUG_LIST_PATH, DrugCatalog  # noqa: E402
+
 # FDA Orange Book URL (Products.txt)
 FDA_PRODUCTS_URL = "https://www.accessdata.fda.gov/cder/ndctext.zip"
 FDA_DIRECT_URL = "https://www.fda.gov/media/76860/download"
@@ -230,14 +232,11 @@ def main():
     print(f"📋 Categories: {df['category'].nunique()}")
     
     # Convert to JSON format
-    drug_list = create_drug_list_json(df)
+    drug_list = DrugCatalog.from_dicts(create_drug_list_json(df))
     
     # Save to src directory
-    output_path = Path(__file__).parent.parent / 'src' / 'drugList.json'
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(drug_list, f, indent=2, ensure_ascii=False)
+    output_path = DRUG_LIST_PATH
+    drug_list.dump(output_path)
     
     print(f"✅ Saved {len(drug_list)} drugs to: {output_path}")
     print()
@@ -245,14 +244,14 @@ def main():
     # Statistics
     print("📈 Database Statistics:")
     print(f"   Total Drugs: {len(drug_list)}")
-    print(f"   With Trade Names: {sum(1 for d in drug_list if d['tradeName'])}")
-    print(f"   Categories: {len(set(d['category'] for d in drug_list))}")
+    print(f"   With Trade Names: {sum(1 for d in drug_list if d.trade_name)}")
+    print(f"   Categories: {len(drug_list.categories())}")
     print()
     
     # Sample entries
     print("📋 Sample Entries:")
-    for drug in drug_list[:5]:
-        print(f"   • {drug['name']} ({drug['tradeName']}) - {drug['approvedFor']}")
+    for drug in drug_list.records[:5]:
+        print(f"   • {drug.name} ({drug.trade_name}) - {drug.approved_for}")
     
     print()
     print("✨ Next step: Run fetch_side_effects.py to enrich with OpenFDA data")
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Synthetic Drug Catalog Generator
+Produces drugList.json-shaped data at any size (1k to 1M+ drugs) for load,
+memory and regression testing of the data scripts and the API.
+
+Distributions follow the enriched sample catalog (src/drugList.json):
+- categories are weighted by their frequency in the sample
+- side-effect terms are drawn from a Zipf-like distribution over a MedDRA-style
+  vocabulary, so a few terms (DRUG INEFFECTIVE, FATIGUE, NAUSEA...) appear on
+  most drugs and the long tail is rare; the sample's own terms head the ranking
+- enriched drugs carry MAX_SIDE_EFFECTS terms, generic fallbacks their
+  category's GENERIC_SIDE_EFFECTS list (as fetch_side_effects.py writes them)
+- a share of drugs are salt/formulation variants of earlier ones
+  ("X Hydrochloride", "X ER"), as in real product lists
+
+Output is deterministic for a given --seed.
+
+Usage:
+    python scripts/generate_synthetic_catalog.py --count 100000 --output data/synthetic/drugList_100k.json
+    python scripts/generate_synthetic_catalog.py --count 1000000 --unenriched --with-counts
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from catalog import DRUG_LIST_PATH, DrugCatalog  # noqa: E402
+from fetch_side_effects import (  # noqa: E402
+    GENERIC_SIDE_EFFECTS, MAX_SIDE_EFFECTS, SALT_SUFFIXES, get_generic_side_effects,
+)
+
+OUTPUT_DIR = Path(__file__).parent.parent / 'data' / 'synthetic'
+
+SYLLABLES = [
+    'ab', 'ac', 'al', 'am', 'an', 'ar', 'ax', 'be', 'bi', 'ca', 'ce', 'ci', 'co', 'da', 'de', 'di',
+    'do', 'fa', 'fe', 'fi', 'ga', 'ge', 'la', 'le', 'li', 'lo', 'ma', 'me', 'mi', 'mo', 'na', 'ne',
+    'ni', 'no', 'pa', 'pe', 'pi', 'pro', 'ra', 're', 'ri', 'ro', 'sa', 'se', 'si', 'ta', 'te', 'ti',
+    'to', 'tra', 'va', 've', 'vi', 'xa', 'ze', 'zi', 'zo',
+]
+STEMS = ['mab', 'nib', 'pril', 'sartan', 'statin', 'olol', 'azole', 'cillin', 'mycin', 'prazole',
+         'tide', 'vir', 'zepam', 'oxetine', 'triptan', 'dronate', 'gliptin', 'lukast', 'parin', 'afil']
+
+# Building blocks for long-tail MedDRA-style preferred terms
+TERM_QUALIFIERS = ['ABNORMAL', 'ACUTE', 'CHRONIC', 'DECREASED', 'INCREASED', 'SEVERE', 'TRANSIENT',
+                   'DRUG-INDUCED', 'RECURRENT', 'LOCALISED']
+TERM_CONCEPTS = ['HEPATIC FUNCTION', 'BLOOD PRESSURE', 'HEART RATE', 'APPETITE', 'WEIGHT', 'VISION',
+                 'RENAL FUNCTION', 'PLATELET COUNT', 'BLOOD GLUCOSE', 'SLEEP', 'MEMORY', 'MUSCLE TONE',
+                 'SKIN SENSITIVITY', 'BONE DENSITY', 'LIBIDO', 'SALIVATION', 'SWEATING', 'BODY TEMPERATURE',
+                 'WHITE BLOOD CELL COUNT', 'CHOLESTEROL', 'POTASSIUM', 'SODIUM', 'MOOD', 'COORDINATION']
+
+DEFAULT_VOCAB_SIZE = 5000
+TIMESTAMP = '2025-01-01T00:00:00'
+ZIPF_EXPONENT = 1.1
+
+
+def load_sample(path=DRUG_LIST_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_vocabulary(sample, size=DEFAULT_VOCAB_SIZE):
+    """Side-effect terms in popularity order: the sample's terms by frequency, then a synthetic tail"""
+    ranked = [term for term, _ in Counter(e for drug in sample for e in drug['sideEffects']).most_common()]
+    seen = set(ranked)
+    for effects in GENERIC_SIDE_EFFECTS.values():
+        for term in effects:
+            term = term.upper()
+            if term not in seen:
+                seen.add(term)
+                ranked.append(term)
+    for qualifier, concept in itertools.product(TERM_QUALIFIERS, TERM_CONCEPTS):
+        term = f"{qualifier} {concept}"
+        if term not in seen:
+            seen.add(term)
+            ranked.append(term)
+    for i in itertools.count(1):
+        if len(ranked) >= size:
+            break
+        ranked.append(f"{TERM_CONCEPTS[i % len(TERM_CONCEPTS)]} DISORDER {i:05d}")
+    return ranked[:size]
+
+
+def zipf_cumulative(size, exponent=ZIPF_EXPONENT):
+    """Cumulative weights for rank 1..size with weight 1 / rank^exponent"""
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def sample_terms(rng, vocabulary, cumulative, k):
+    """k distinct terms, most frequent first (as OpenFDA returns them)"""
+    total = cumulative[-1]
+    ranks = set()
+    while len(ranks) < k:
+        ranks.add(bisect.bisect_left(cumulative, rng.random() * total))
+    return [vocabulary[rank] for rank in sorted(ranks)]
+
+
+def drug_names(rng, seen):
+    """Endless stream of pronounceable generic names not yet in ``seen``"""
+    for i in itertools.count():
+        syllables = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+        name = (syllables + rng.choice(STEMS)).capitalize()
+        if name in seen:
+            name = f"{name}-{i}"
+        yield name
+
+
+def generate_drugs(count, seed=0, enriched=True, vocab_size=DEFAULT_VOCAB_SIZE,
+                   variant_share=0.15, generic_share=0.05, sample=None):
+    """Yield ``count`` drugList-shaped dicts with unique names
+
+    A generator, so 1M drugs stream out without all of the dicts being held
+    at once (only the set of names used so far).
+    """
+    rng = random.Random(seed)
+    sample = sample or load_sample()
+    category_counts = Counter(drug['category'] for drug in sample)
+    categories = list(category_counts)
+    category_weights = list(itertools.accumulate(category_counts[c] for c in categories))
+    profiles = {}
+    for drug in sample:
+        profiles.setdefault(drug['category'], []).append(drug)
+    vocabulary = build_vocabulary(sample, vocab_size)
+    cumulative = zipf_cumulative(len(vocabulary))
+    used = set()
+    names = drug_names(rng, used)
+    salts = sorted(SALT_SUFFIXES)
+    recent = []  # reservoir of base drugs that variants are derived from
+
+    for _ in range(count):
+        variant = False
+        if recent and rng.random() < variant_share:
+            base = rng.choice(recent)
+            salt = rng.choice(salts)
+            name = f"{base['name']} {salt.upper() if len(salt) <= 3 else salt.title()}"
+            variant = name not in used
+        if variant:
+            category, approved_for, trade_name = base['category'], base['approvedFor'], base['tradeName']
+        else:
+            name = next(names)
+            category = rng.choices(categories, cum_weights=category_weights)[0]
+            template = rng.choice(profiles[category])
+            approved_for = template['approvedFor']
+            trade_name = f"{name[:4].title()}{rng.choice(['ex', 'ia', 'on', 'yl', 'ra'])}"
+
+        used.add(name)
+        drug = {
+            "name": name,
+            "tradeName": trade_name,
+            "approvedFor": approved_for,
+            "description": profiles[category][0]['description'],
+            "category": category,
+            "sideEffects": [],
+            "enriched": False,
+            "lastUpdated": TIMESTAMP
+        }
+        if enriched:
+            if rng.random() < generic_share:
+                drug["sideEffects"] = list(get_generic_side_effects(category))
+                drug["dataSource"] = 'Generic'
+            else:
+                drug["sideEffects"] = sample_terms(rng, vocabulary, cumulative, MAX_SIDE_EFFECTS)
+                drug["dataSource"] = 'OpenFDA'
+            drug["enriched"] = True
+
+        if not variant:
+            if len(recent) < 1000:
+                recent.append(drug)
+            elif rng.random() < 0.01:
+                recent[rng.randrange(len(recent))] = drug
+        yield drug
+
+
+def synthetic_counts(catalog, seed=0):
+    """{drug name: [{'term', 'count'}]} report counts for OpenFDA drugs, heavy-tailed and descending"""
+    rng = random.Random(seed)
+    counts = {}
+    for drug in catalog:
+        if drug.data_source != 'OpenFDA':
+            continue
+        total = int(rng.lognormvariate(7, 1.5)) + 10
+        profile = []
+        for rank, term in enumerate(drug.side_effects, 1):
+            profile.append({'term': term, 'count': max(1, int(total / rank ** 0.8))})
+        counts[drug.name] = profile
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic drugList.json-shaped catalog")
+    parser.add_argument('--count', type=int, default=10000, help="Number of drugs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vocab-size', type=int, default=DEFAULT_VOCAB_SIZE, help="Distinct side-effect terms")
+    parser.add_argument('--unenriched', action='store_true', help="Empty sideEffects, as generate_drug_list.py writes")
+    parser.add_argument('--with-counts', action='store_true', help="Also write a sideEffectMatrix.npz next to the output")
+    parser.add_argument('--output', help="Path (default: data/synthetic/drugList_<count>.json)")
+    args = parser.parse_args()
+
+    output = Path(args.output) if args.output else OUTPUT_DIR / f"drugList_{args.count}.json"
+    start = time.perf_counter()
+    catalog = DrugCatalog.from_dicts(generate_drugs(
+        args.count, seed=args.seed, enriched=not args.unenriched, vocab_size=args.vocab_size
+    ))
+    catalog.dump(output)
+    print(f"✅ Saved {len(catalog)} synthetic drugs ({len(catalog.side_effect_vocab)} side-effect terms, "
+          f"{len(catalog.categories())} categories) to: {output}")
+
+    if args.with_counts and not args.unenriched:
+        from side_effect_matrix import SideEffectMatrix
+        matrix = SideEffectMatrix.build(catalog, synthetic_counts(catalog, args.seed))
+        matrix_path = output.with_name(output.stem + '.npz')
+        matrix.save(matrix_path)
+        print(f"✅ Saved {matrix.shape[0]} x {matrix.shape[1]} count matrix to: {matrix_path}")
+    print(f"⏱️  {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
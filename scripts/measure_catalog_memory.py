@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Catalog Memory Measurement
+Compares retained memory of drugList.json loaded as plain dicts vs the compact
+DrugCatalog, at the real catalog size scaled up to the given drug counts.
+
+Usage:
+    python scripts/measure_catalog_memory.py            # 4,000 and 100,000 drugs
+    python scripts/measure_catalog_memory.py 1000 250000
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from catalog import DRUG_LIST_PATH, DrugCatalog  # noqa: E402
+
+
+def scaled_drug_list_text(base, n):
+    """drugList.json text with n entries, replicating base with unique names/timestamps"""
+    start = datetime(2025, 1, 1)
+    drugs = []
+    for i in range(n):
+        drug = dict(base[i % len(base)])
+        if i >= len(base):
+            drug['name'] = f"{drug['name']} {i // len(base)}"
+        drug['lastUpdated'] = (start + timedelta(seconds=i)).isoformat()
+        drugs.append(drug)
+    return json.dumps(drugs)
+
+
+def measure(text):
+    """Retained bytes for json.loads dicts, then for the catalog built from them"""
+    gc.collect()
+    tracemalloc.start()
+    drugs = json.loads(text)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+
+    catalog = DrugCatalog.from_dicts(drugs)
+    del drugs
+    gc.collect()
+    catalog_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return dict_bytes, catalog_bytes, catalog
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [4000, 100000]
+
+    with open(DRUG_LIST_PATH, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+
+    print("=" * 60)
+    print("CATALOG MEMORY MEASUREMENT")
+    print("=" * 60)
+    print(f"{'drugs':>10}{'dicts MB':>12}{'catalog MB':>13}{'reduction':>12}{'vocab':>8}")
+    for n in sizes:
+        dict_bytes, catalog_bytes, catalog = measure(scaled_drug_list_text(base, n))
+        print(f"{n:>10,}{dict_bytes / 1e6:>12.1f}{catalog_bytes / 1e6:>13.1f}"
+              f"{1 - catalog_bytes / dict_bytes:>12.1%}{len(catalog.side_effect_vocab):>8}")
+        del catalog
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Mock Upstream Server
+Local stand-in for the external data sources used by the enrichment scripts,
+the API and the frontend services, for offline load testing.
+
+Replays data/mock fixtures and src/drugList.json through the same URL shapes as:
+    OpenFDA         /openfda/drug/event.json
+    PubChem         /pubchem/rest/pug/compound/name/{name}/JSON
+    PubMed          /pubmed/entrez/eutils/esearch.fcgi
+    ClinicalTrials  /clinicaltrials/api/v2/studies
+    RxNorm          /rxnav/REST/...
+
+Point the clients at it with e.g.
+    OPENFDA_BASE=http://localhost:8100/openfda/drug/event.json python scripts/fetch_side_effects.py
+    VITE_PUBCHEM_BASE=http://localhost:8100/pubchem/rest/pug npm run dev
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+ROOT = Path(__file__).parent.parent
+DRUG_LIST_PATH = ROOT / 'src' / 'drugList.json'
+SIDER_PATH = ROOT / 'data' / 'mock' / 'drugs_sider.json'
+PATENTS_PATH = ROOT / 'data' / 'mock' / 'patents.json'
+
+SERVICES = ('openfda', 'pubchem', 'pubmed', 'clinicaltrials', 'rxnav')
+
+# Upstream-like defaults (milliseconds); override with --latency
+DEFAULT_LATENCY = {
+    'openfda': 'lognormal:180:0.5',
+    'pubchem': 'lognormal:250:0.6',
+    'pubmed': 'lognormal:300:0.6',
+    'clinicaltrials': 'lognormal:400:0.7',
+    'rxnav': 'lognormal:120:0.4',
+}
+
+TRIAL_STATUSES = ['RECRUITING', 'COMPLETED', 'ACTIVE_NOT_RECRUITING', 'TERMINATED']
+TRIAL_PHASES = ['PHASE1', 'PHASE2', 'PHASE3', 'PHASE4']
+
+
+def load_json(path, default):
+    """Load a JSON fixture, tolerating missing or empty files"""
+    try:
+        text = Path(path).read_text(encoding='utf-8').strip()
+    except OSError:
+        return default
+    if not text:
+        return default
+    return json.loads(text)
+
+
+def stable_int(*parts):
+    """Deterministic integer derived from the given strings"""
+    return zlib.crc32('|'.join(str(p).lower() for p in parts).encode('utf-8'))
+
+
+class LatencyModel:
+    """Samples response delays (seconds) from a named distribution
+
+    Spec format: ``kind:arg1:arg2`` in milliseconds, e.g.
+        fixed:50            always 50 ms
+        uniform:20:200      uniform between 20 and 200 ms
+        normal:100:25       mean 100 ms, stddev 25 ms
+        lognormal:180:0.5   median 180 ms, sigma 0.5 (long tail)
+        exponential:100     mean 100 ms
+    """
+
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+    def __init__(self, spec, rng):
+        kind, *args = spec.split(':')
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}' (expected one of {', '.join(self.KINDS)})")
+        self.spec = spec
+        self.kind = kind
+        self.args = [float(a) for a in args]
+        self.rng = rng
+
+    def sample(self):
+        a = self.args
+        if self.kind == 'fixed':
+            ms = a[0]
+        elif self.kind == 'uniform':
+            ms = self.rng.uniform(a[0], a[1])
+        elif self.kind == 'normal':
+            ms = self.rng.gauss(a[0], a[1])
+        elif self.kind == 'lognormal':
+            ms = a[0] * self.rng.lognormvariate(0, a[1])
+        else:
+            ms = self.rng.expovariate(1 / a[0])
+        return max(ms, 0) / 1000
+
+
+class TokenBucket:
+    """Per-service request budget; empty bucket means HTTP 429"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def retry_after(self):
+        return max(1, int((1 - self.tokens) / self.rate) + 1)
+
+
+class MockData:
+    """Fixture-backed lookups shared by all mocked services"""
+
+    def __init__(self, drug_list, sider, patents):
+        self.drugs = {}
+        for drug in drug_list:
+            self.drugs[drug['name'].lower()] = drug
+            if drug.get('tradeName'):
+                self.drugs.setdefault(drug['tradeName'].lower(), drug)
+
+        # SIDER fixture overrides drugList side effects when present
+        self.side_effects = {key: drug.get('sideEffects', []) for key, drug in self.drugs.items()}
+        entries = sider.items() if isinstance(sider, dict) else (
+            (e.get('drug_name') or e.get('name'), e) for e in sider
+        )
+        for name, entry in entries:
+            if not name:
+                continue
+            effects = entry.get('side_effects', []) if isinstance(entry, dict) else entry
+            self.side_effects[name.lower()] = [str(e).upper() for e in effects]
+
+        self.patents = patents
+        self.names = sorted({drug['name'] for drug in drug_list})
+
+    @classmethod
+    def load(cls):
+        return cls(
+            load_json(DRUG_LIST_PATH, []),
+            load_json(SIDER_PATH, []),
+            load_json(PATENTS_PATH, []),
+        )
+
+    def lookup(self, name):
+        return self.drugs.get((name or '').strip().strip('"').lower())
+
+    def reaction_counts(self, name, limit):
+        """OpenFDA-style term/count pairs, heaviest first"""
+        effects = self.side_effects.get((name or '').lower(), [])
+        base = 2000 + stable_int(name) % 20000
+        counts = [
+            {'term': term, 'count': max(1, int(base * 0.8 ** rank) + stable_int(name, term) % 50)}
+            for rank, term in enumerate(effects)
+        ]
+        counts.sort(key=lambda item: item['count'], reverse=True)
+        return counts[:limit]
+
+    def rxcui(self, name):
+        return str(100000 + stable_int(name) % 900000)
+
+    def by_rxcui(self, rxcui):
+        for name in self.names:
+            if self.rxcui(name) == rxcui:
+                return self.drugs[name.lower()]
+        return None
+
+    def matching(self, query, limit):
+        query = (query or '').lower()
+        return [n for n in self.names if query in n.lower()][:limit]
+
+
+def not_found(message='No matches found!'):
+    return JSONResponse({'error': {'code': 'NOT_FOUND', 'message': message}}, status_code=404)
+
+
+def create_app(data, latency, error_rate=0.0, throttle_rate=0.0, rate_limits=None, seed=None):
+    """Build the mock server app
+
+    latency: {service: LatencyModel}
+    error_rate / throttle_rate: probability of a random 5xx / 429 per request
+    rate_limits: {service: requests per minute} enforced with a token bucket
+    """
+    rng = random.Random(seed)
+    buckets = {service: TokenBucket(limit) for service, limit in (rate_limits or {}).items()}
+    stats = {service: {'requests': 0, 'errors': 0, 'throttled': 0} for service in SERVICES}
+
+    app = FastAPI(title="Mock Upstream Server", version="1.0.0")
+
+    @app.middleware("http")
+    async def inject_upstream_behaviour(request: Request, call_next):
+        service = request.url.path.strip('/').split('/', 1)[0]
+        if service not in stats:
+            return await call_next(request)
+
+        stats[service]['requests'] += 1
+        if service in latency:
+            await asyncio.sleep(latency[service].sample())
+
+        bucket = buckets.get(service)
+        if bucket and not bucket.take():
+            stats[service]['throttled'] += 1
+            return JSONResponse(
+                {'error': {'code': 'OVER_RATE_LIMIT', 'message': 'API rate limit exceeded'}},
+                status_code=429,
+                headers={'Retry-After': str(bucket.retry_after())},
+            )
+        if throttle_rate and rng.random() < throttle_rate:
+            stats[service]['throttled'] += 1
+            return JSONResponse(
+                {'error': {'code': 'OVER_RATE_LIMIT', 'message': 'API rate limit exceeded'}},
+                status_code=429,
+                headers={'Retry-After': '1'},
+            )
+        if error_rate and rng.random() < error_rate:
+            stats[service]['errors'] += 1
+            return JSONResponse({'error': {'code': 'SERVER_ERROR'}}, status_code=rng.choice([500, 502, 503]))
+
+        return await call_next(request)
+
+    @app.get("/_stats")
+    async def get_stats():
+        """Per-service request, error and throttle counters"""
+        return stats
+
+    # OpenFDA
+    @app.get("/openfda/drug/event.json")
+    async def openfda_events(search: str = '', count: str = '', limit: int = 1):
+        match = re.search(r'medicinalproduct:"?([^"]+)"?', search)
+        name = match.group(1) if match else ''
+        if not data.lookup(name) and name.lower() not in data.side_effects:
+            return not_found()
+
+        counts = data.reaction_counts(name, 1000)
+        if count:
+            return {'meta': {'disclaimer': 'Mock data'}, 'results': counts[:limit]}
+
+        total = sum(item['count'] for item in counts)
+        events = [
+            {
+                'serious': '1' if stable_int(name, i) % 3 == 0 else '2',
+                'patient': {'reaction': [{'reactionmeddrapt': counts[i % len(counts)]['term']}] if counts else []},
+            }
+            for i in range(min(limit, 100))
+        ]
+        return {'meta': {'results': {'skip': 0, 'limit': limit, 'total': total}}, 'results': events}
+
+    # PubChem
+    @app.get("/pubchem/rest/pug/compound/name/{name}/JSON")
+    async def pubchem_compound(name: str):
+        drug = data.lookup(name)
+        if not drug:
+            return JSONResponse({'Fault': {'Code': 'PUGREST.NotFound', 'Message': 'No CID found'}}, status_code=404)
+        seed_value = stable_int(drug['name'])
+        return {'PC_Compounds': [{
+            'id': {'id': {'cid': seed_value % 10000000}},
+            'props': [
+                {'urn': {'label': 'IUPAC Name'}, 'value': {'sval': drug['name'].lower()}},
+                {'urn': {'label': 'Molecular Formula'}, 'value': {'sval': f"C{10 + seed_value % 20}H{12 + seed_value % 30}N{seed_value % 5}O{seed_value % 6}"}},
+                {'urn': {'label': 'Molecular Weight'}, 'value': {'fval': 150 + seed_value % 500 + 0.17}},
+            ],
+        }]}
+
+    # PubMed
+    @app.get("/pubmed/entrez/eutils/esearch.fcgi")
+    async def pubmed_search(term: str = '', retmax: int = 20):
+        name = term.replace('+', ' ').split(' ')[0]
+        total = stable_int(name, 'pubmed') % 800 if data.lookup(name) else 0
+        ids = [str(30000000 + stable_int(name, i) % 9000000) for i in range(min(retmax, total))]
+        return {'esearchresult': {'count': str(total), 'retmax': str(len(ids)), 'idlist': ids}}
+
+    # ClinicalTrials.gov
+    @app.get("/clinicaltrials/api/v2/studies")
+    async def clinical_trials(request: Request):
+        name = request.query_params.get('query.intr', '')
+        page_size = int(request.query_params.get('pageSize', 10))
+        total = stable_int(name, 'trials') % 60 if data.lookup(name) else 0
+        studies = [
+            {'protocolSection': {
+                'identificationModule': {'nctId': f"NCT{stable_int(name, i) % 100000000:08d}"},
+                'statusModule': {'overallStatus': TRIAL_STATUSES[stable_int(name, i, 's') % len(TRIAL_STATUSES)]},
+                'designModule': {'phases': [TRIAL_PHASES[stable_int(name, i, 'p') % len(TRIAL_PHASES)]]},
+            }}
+            for i in range(min(page_size, total))
+        ]
+        return {'totalCount': total, 'studies': studies}
+
+    # RxNorm
+    @app.get("/rxnav/REST/approximateTerm.json")
+    async def rxnorm_approximate(term: str = '', maxEntries: int = 20):
+        candidates = [
+            {'rxcui': data.rxcui(name), 'rxaui': data.rxcui(name), 'score': str(100 - rank), 'rank': str(rank + 1), 'name': name}
+            for rank, name in enumerate(data.matching(term, maxEntries))
+        ]
+        return {'approximateGroup': {'inputTerm': term, 'candidate': candidates}}
+
+    @app.get("/rxnav/REST/rxcui/{rxcui}/properties.json")
+    async def rxnorm_properties(rxcui: str):
+        drug = data.by_rxcui(rxcui)
+        if not drug:
+            return {}
+        return {'properties': {
+            'rxcui': rxcui, 'name': drug['name'].lower(), 'synonym': drug.get('tradeName', ''),
+            'tty': 'IN', 'language': 'ENG',
+        }}
+
+    @app.get("/rxnav/REST/rxcui/{rxcui}/related.json")
+    async def rxnorm_related(rxcui: str):
+        drug = data.by_rxcui(rxcui)
+        if not drug:
+            return {'relatedGroup': {'rxcui': rxcui, 'conceptGroup': []}}
+        name = drug['name']
+        groups = [{'tty': 'IN', 'conceptProperties': [{'rxcui': rxcui, 'name': name.lower()}]}]
+        if drug.get('tradeName'):
+            groups.append({'tty': 'BN', 'conceptProperties': [{'rxcui': data.rxcui(drug['tradeName']), 'name': drug['tradeName']}]})
+        return {'relatedGroup': {'rxcui': rxcui, 'conceptGroup': groups}}
+
+    @app.get("/rxnav/REST/spellingsuggestions.json")
+    async def rxnorm_spelling(name: str = ''):
+        prefix = name[:3].lower()
+        suggestions = [n.lower() for n in data.names if n.lower().startswith(prefix)][:10]
+        return {'suggestionGroup': {'name': name, 'suggestionList': {'suggestion': suggestions}}}
+
+    @app.get("/rxnav/REST/displaynames.json")
+    async def rxnorm_display_names(name: str = '', maxEntries: int = 20):
+        return {'displayTermsList': {'term': [n.lower() for n in data.matching(name, maxEntries)]}}
+
+    @app.get("/rxnav/REST/interaction/interaction.json")
+    async def rxnorm_interactions(rxcui: str = ''):
+        drug = data.by_rxcui(rxcui)
+        if not drug:
+            return {}
+        partners = [n for n in data.names if n != drug['name']]
+        pairs = [
+            {
+                'interactionConcept': [
+                    {'minConceptItem': {'rxcui': rxcui, 'name': drug['name'].lower()}},
+                    {'minConceptItem': {'rxcui': data.rxcui(other), 'name': other.lower()}},
+                ],
+                'severity': 'N/A',
+                'description': f"Mock interaction between {drug['name']} and {other}.",
+            }
+            for other in partners[stable_int(rxcui) % max(len(partners), 1):][:3]
+        ]
+        return {'interactionTypeGroup': [{'interactionType': [{'interactionPair': pairs}]}]}
+
+    return app
+
+
+def parse_service_options(values, defaults, cast=str):
+    """Parse repeated ``service=value`` options; a bare value applies to all services"""
+    options = dict(defaults)
+    for value in values or []:
+        service, sep, setting = value.partition('=')
+        if not sep:
+            options = {s: cast(service) for s in SERVICES}
+        elif service in SERVICES:
+            options[service] = cast(setting)
+        else:
+            raise ValueError(f"Unknown service '{service}' (expected one of {', '.join(SERVICES)})")
+    return options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of OpenFDA, PubChem, PubMed, ClinicalTrials.gov and RxNorm")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency', action='append', metavar='[SERVICE=]SPEC',
+                        help="Latency distribution, e.g. 'lognormal:180:0.5' or 'openfda=fixed:50' (repeatable)")
+    parser.add_argument('--no-latency', action='store_true', help="Disable latency injection")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of a random 5xx response")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Probability of a random 429 response")
+    parser.add_argument('--rate-limit', action='append', metavar='[SERVICE=]PER_MINUTE',
+                        help="Token-bucket limit returning 429 when exceeded, e.g. 'openfda=240' (repeatable)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible latency/error sequences")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    try:
+        specs = {} if args.no_latency else parse_service_options(args.latency, DEFAULT_LATENCY)
+        latency = {service: LatencyModel(spec, rng) for service, spec in specs.items()}
+        rate_limits = parse_service_options(args.rate_limit, {}, cast=float)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    data = MockData.load()
+
+    print("=" * 60)
+    print("MOCK UPSTREAM SERVER")
+    print("=" * 60)
+    print(f"📊 Loaded {len(data.names)} drugs")
+    for service in SERVICES:
+        spec = latency[service].spec if service in latency else 'none'
+        limit = f", {rate_limits[service]:.0f} req/min" if service in rate_limits else ''
+        print(f"   • /{service}: latency {spec}{limit}")
+    print(f"⚠️  Error rate: {args.error_rate:.1%}, throttle rate: {args.throttle_rate:.1%}")
+    print(f"🌐 Listening on http://{args.host}:{args.port}")
+    print("=" * 60)
+
+    app = create_app(data, latency, args.error_rate, args.throttle_rate, rate_limits, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
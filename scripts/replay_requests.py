@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Request Log Replay
+Streams a captured request log (request_log.py / REQUEST_LOG_ENABLED=true)
+back against a target server to reproduce production load shapes.
+
+Rates:
+    --speed 1       original inter-arrival times (default)
+    --speed 4       4x faster than recorded
+    --max-rate      as fast as --concurrency allows
+
+Usage:
+    python scripts/replay_requests.py logs/requests.jsonl --target http://localhost:8000 --speed 2
+    python scripts/replay_requests.py logs/requests.jsonl.1 logs/requests.jsonl --max-rate --concurrency 16
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+
+def read_log(paths, path_filter=None):
+    """Stream records from one or more JSONL files in order (never loads a whole file)"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if path_filter and not record['path'].startswith(tuple(path_filter)):
+                    continue
+                yield record
+
+
+class Replayer:
+    """Sends records on schedule with a bounded pool of pooled sessions"""
+
+    def __init__(self, target, concurrency, timeout):
+        self.target = target.rstrip('/')
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        # Bound in-flight work so a long log streams instead of queueing up in memory
+        self.slots = threading.BoundedSemaphore(concurrency * 2)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stats = {'sent': 0, 'skipped': 0, 'ok': 0, 'errors': 0, 'status_mismatch': 0, 'latencies': []}
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def _send(self, record):
+        url = self.target + record['path'] + (f"?{record['query']}" if record.get('query') else '')
+        body = record.get('body')
+        start = time.perf_counter()
+        try:
+            response = self._session().request(record.get('method', 'GET'), url, json=body, timeout=self.timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = 0
+        latency = time.perf_counter() - start
+        with self.lock:
+            self.stats['latencies'].append(latency)
+            if 200 <= status < 400:
+                self.stats['ok'] += 1
+            else:
+                self.stats['errors'] += 1
+            if record.get('status') is not None and record['status'] != status:
+                self.stats['status_mismatch'] += 1
+
+    def submit(self, record):
+        body = record.get('body')
+        if isinstance(body, dict) and ('_truncated' in body or '_raw' in body):
+            # The log kept only a placeholder for this body, so it cannot be replayed faithfully
+            self.stats['skipped'] += 1
+            return
+        self.slots.acquire()
+        self.stats['sent'] += 1
+        future = self.pool.submit(self._send, record)
+        future.add_done_callback(lambda _: self.slots.release())
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a captured request log against a server")
+    parser.add_argument('logs', nargs='+', help="JSONL log file(s), oldest first")
+    parser.add_argument('--target', default='http://localhost:8000')
+    parser.add_argument('--speed', type=float, default=1.0, help="Time scale vs recorded rate (2 = twice as fast)")
+    parser.add_argument('--max-rate', action='store_true', help="Ignore timestamps and send as fast as possible")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--path', action='append', help="Only replay paths with this prefix (repeatable)")
+    parser.add_argument('--limit', type=int, help="Stop after this many requests")
+    args = parser.parse_args()
+
+    missing = [p for p in args.logs if not Path(p).exists()]
+    if missing:
+        print(f"❌ Log not found: {', '.join(missing)}")
+        sys.exit(1)
+    if args.speed <= 0:
+        print("❌ --speed must be positive")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("REQUEST LOG REPLAY")
+    print("=" * 60)
+    print(f"🎯 Target: {args.target}")
+    print(f"⏱️  Rate: {'max' if args.max_rate else f'{args.speed:g}x recorded'}, concurrency {args.concurrency}")
+    print()
+
+    replayer = Replayer(args.target, args.concurrency, args.timeout)
+    first_ts = None
+    start = time.perf_counter()
+    try:
+        for i, record in enumerate(read_log(args.logs, args.path)):
+            if args.limit and i >= args.limit:
+                break
+            if not args.max_rate and record.get('ts') is not None:
+                if first_ts is None:
+                    first_ts = record['ts']
+                due = (record['ts'] - first_ts) / args.speed
+                delay = due - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            replayer.submit(record)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted, waiting for in-flight requests...")
+    finally:
+        replayer.close()
+    elapsed = time.perf_counter() - start
+
+    stats = replayer.stats
+    latencies = sorted(stats['latencies'])
+    if stats['skipped']:
+        print(f"⚠️  Skipped {stats['skipped']} request(s) whose body was truncated or not JSON in the log")
+    if not latencies:
+        print("⚠️  No requests replayed")
+        return
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    print("📈 Replay Statistics:")
+    print(f"   Requests: {stats['sent']} in {elapsed:.1f}s ({stats['sent'] / elapsed:.1f} req/s)")
+    print(f"   OK: {stats['ok']}   Errors: {stats['errors']}   Status differs from log: {stats['status_mismatch']}")
+    print(f"   Latency p50/p95/p99: {pct(50):.1f} / {pct(95):.1f} / {pct(99):.1f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
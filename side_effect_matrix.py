@@ -0,0 +1,258 @@
+"""
+Side-Effect Matrix
+Sparse drug x side-effect-term matrix of OpenFDA report counts, stored next to
+src/drugList.json as sideEffectMatrix.npz (written by fetch_side_effects.py).
+
+Rows follow catalog order, columns are MedDRA terms. Drugs without stored
+counts (generic fallback, or enriched before counts were kept) get weight 1.0
+for each listed side effect, so every catalog drug has a row. Count profiles
+run deeper than the side effects a drug lists, so set-based metrics use a
+presence matrix of the listed side effects, built on first use when the
+matrix was made for a catalog.
+
+Similarity between weighted profiles is computed as sparse matrix products
+instead of per-pair Python set loops.
+"""
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from catalog import DRUG_LIST_PATH
+
+MATRIX_PATH = DRUG_LIST_PATH.with_name('sideEffectMatrix.npz')
+FORMAT_VERSION = 1
+
+METRICS = ('cosine', 'jaccard')
+
+
+class SideEffectMatrix:
+    """CSR matrix of side-effect report counts with drug/term labels"""
+
+    def __init__(self, matrix, drugs, terms, catalog=None):
+        self.matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+        self.drugs = list(drugs)
+        self.terms = list(terms)
+        self._drug_index = {name.lower(): i for i, name in enumerate(self.drugs)}
+        self._term_index = {term: j for j, term in enumerate(self.terms)}
+        self._normalized = None
+        self._binary = None
+        self._catalog = catalog
+
+    @classmethod
+    def build(cls, catalog, counts=None):
+        """Build from a DrugCatalog plus optional {drug name: [{'term', 'count'}, ...]}"""
+        counts = counts or {}
+        terms = {}
+        data, indices, indptr = [], [], [0]
+        for record in catalog:
+            profile = counts.get(record.name)
+            if profile:
+                pairs = [(item['term'], float(item['count'])) for item in profile]
+            else:
+                pairs = [(term, 1.0) for term in record.side_effects]
+            row = {}
+            for term, count in pairs:
+                column = terms.setdefault(term, len(terms))
+                row[column] = row.get(column, 0.0) + count
+            for column in sorted(row):
+                indices.append(column)
+                data.append(row[column])
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(catalog), len(terms)),
+        )
+        return cls(matrix, [record.name for record in catalog], list(terms), catalog)
+
+    @classmethod
+    def for_catalog(cls, catalog, path=MATRIX_PATH):
+        """Matrix aligned to the catalog's rows, using stored counts where still valid
+
+        A stored row is reused only if it holds real report counts and covers
+        every side effect the drug lists now; other rows are rebuilt from the
+        catalog, so a re-enriched or fallback drug never keeps a stale profile.
+        """
+        if not Path(path).exists():
+            return cls.build(catalog)
+        stored = cls.load(path)
+        same_drugs = stored.drugs == [record.name for record in catalog]
+        reuse_as_is = same_drugs
+        counts = {}
+        for i, record in enumerate(catalog):
+            row = i if same_drugs else stored.row(record.name)
+            if row is not None and stored._row_has_counts(row, record.side_effects):
+                columns, values = stored._row_terms(row)
+                counts[record.name] = [{'term': stored.terms[j], 'count': float(v)} for j, v in zip(columns, values)]
+            elif reuse_as_is and not stored._row_is_listed(row, record.side_effects):
+                reuse_as_is = False
+        if reuse_as_is:
+            stored._catalog = catalog
+            return stored
+        return cls.build(catalog, counts)
+
+    def _row_terms(self, row):
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return self.matrix.indices[start:end], self.matrix.data[start:end]
+
+    def _row_has_counts(self, row, side_effects):
+        """Row holds report counts (not 1.0 weights) that include every listed side effect"""
+        columns, values = self._row_terms(row)
+        if not len(values) or values.max() <= 1:
+            return False
+        return {self.terms[j] for j in columns}.issuperset(side_effects)
+
+    def _row_is_listed(self, row, side_effects):
+        """Row is exactly the 1.0-weight profile built from these side effects"""
+        columns, values = self._row_terms(row)
+        return bool((values == 1).all()) and {self.terms[j] for j in columns} == set(side_effects)
+
+    @classmethod
+    def load(cls, path=MATRIX_PATH):
+        with np.load(path, allow_pickle=False) as f:
+            if int(f['format_version']) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported side-effect matrix format {int(f['format_version'])}")
+            matrix = sparse.csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+            return cls(matrix, f['drugs'].tolist(), f['terms'].tolist())
+
+    def save(self, path=MATRIX_PATH):
+        m = self.matrix
+        np.savez_compressed(
+            path,
+            format_version=np.int32(FORMAT_VERSION),
+            data=m.data, indices=m.indices, indptr=m.indptr, shape=np.asarray(m.shape, dtype=np.int64),
+            drugs=np.asarray(self.drugs, dtype=str), terms=np.asarray(self.terms, dtype=str),
+        )
+
+    def counts_for(self, name):
+        """Stored {term: count} profile of one drug, heaviest first"""
+        row = self.row(name)
+        if row is None:
+            return {}
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        pairs = zip(self.matrix.indices[start:end], self.matrix.data[start:end])
+        return {self.terms[j]: float(v) for j, v in sorted(pairs, key=lambda p: -p[1])}
+
+    def row(self, name):
+        return self._drug_index.get((name or '').strip().lower())
+
+    def term_column(self, term):
+        return self._term_index.get(term)
+
+    def frequencies(self):
+        """Rows scaled to sum to 1: share of each drug's reports per term"""
+        totals = np.asarray(self.matrix.sum(axis=1)).ravel()
+        totals[totals == 0] = 1
+        return sparse.diags(1 / totals) @ self.matrix
+
+    def normalized(self):
+        """L2-normalized count rows (cached), so X @ X.T is cosine similarity"""
+        if self._normalized is None:
+            m = self.matrix
+            norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+            norms[norms == 0] = 1
+            self._normalized = sparse.csr_matrix(sparse.diags(1 / norms) @ m, dtype=np.float32)
+        return self._normalized
+
+    def weighted_similarity(self, rows=None):
+        """Frequency-weighted cosine similarity of the given rows (default all) to every drug"""
+        normalized = self.normalized()
+        left = normalized if rows is None else normalized[rows]
+        return left @ normalized.T
+
+    def binary(self):
+        """0/1 matrix of each drug's listed side effects (cached) for set-based metrics
+
+        Needs the catalog from build()/for_catalog(); a matrix loaded on its own
+        falls back to the presence of its count terms.
+        """
+        if self._binary is None and self._catalog is not None:
+            self._binary = _listed_matrix(self._catalog, self._term_index)
+        if self._binary is None:
+            binary = self.matrix.copy()
+            binary.data[:] = 1
+            self._binary = binary
+        return self._binary
+
+    def jaccard_similarity(self, rows=None):
+        """Jaccard similarity of listed side-effect sets: |A ∩ B| / |A ∪ B|, as a dense array"""
+        binary = self.binary()
+        left = binary if rows is None else binary[rows]
+        intersection = np.asarray((left @ binary.T).todense())
+        sizes = np.asarray(binary.sum(axis=1)).ravel()
+        left_sizes = sizes if rows is None else sizes[rows]
+        union = left_sizes[:, None] + sizes[None, :] - intersection
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(union > 0, intersection / union, 0.0)
+
+    def similarity(self, rows, metric='cosine'):
+        """Dense len(rows) x drugs similarity block for the given metric"""
+        if metric == 'cosine':
+            return np.asarray(self.weighted_similarity(rows).todense())
+        if metric == 'jaccard':
+            return self.jaccard_similarity(rows)
+        raise ValueError(f"Unknown metric '{metric}' (expected one of {', '.join(METRICS)})")
+
+    def top_k(self, rows, k=10, metric='cosine', min_score=0.0):
+        """Nearest neighbours of each row, excluding itself
+
+        One sparse product for the whole block of rows. Returns a list (per
+        row) of (drug index, score) pairs, best first.
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        scores = self.similarity(rows, metric)
+        scores[np.arange(len(rows)), rows] = -np.inf
+        k = min(k, scores.shape[1] - 1)
+        if k <= 0:
+            return [[] for _ in rows]
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for i, columns in enumerate(candidates):
+            ordered = columns[np.argsort(-scores[i, columns], kind='stable')]
+            results.append([(int(j), float(scores[i, j])) for j in ordered if scores[i, j] > min_score])
+        return results
+
+    def profile_vector(self, weights):
+        """1 x terms normalized CSR vector from a {term: weight} dict (unknown terms ignored)"""
+        columns, values = [], []
+        for term, weight in weights.items():
+            column = self._term_index.get(term)
+            if column is not None:
+                columns.append(column)
+                values.append(float(weight))
+        vector = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float32), ([0] * len(columns), columns)),
+            shape=(1, len(self.terms)),
+        )
+        norm = np.sqrt(vector.multiply(vector).sum())
+        return vector / norm if norm else vector
+
+    def profile_similarity(self, weights):
+        """Cosine similarity of a {term: weight} profile to every drug, as a dense array"""
+        return np.asarray((self.normalized() @ self.profile_vector(weights).T).todense()).ravel()
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def __len__(self):
+        return len(self.drugs)
+
+
+def _listed_matrix(catalog, term_index):
+    """0/1 CSR of each record's listed side effects over the given {term: column} index
+
+    Listed terms are the head of a drug's count profile, so every one has a
+    column; any that do not are skipped.
+    """
+    indices, indptr = [], [0]
+    for record in catalog:
+        indices.extend(sorted({term_index[term] for term in record.side_effects if term in term_index}))
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(catalog), len(term_index)),
+    )
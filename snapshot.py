@@ -0,0 +1,217 @@
+"""
+Data Snapshots
+Versioned, hot-reloadable view of the catalog (src/drugList.json) and data/mock
+fixtures.
+
+A SnapshotStore holds the current DataSnapshot. Readers take one reference per
+request (``store.current``) and keep using it, so a reload never changes data
+under an in-flight request. A FileWatcher polls the source files and rebuilds
+the snapshot in the background, swapping it in atomically when complete.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from catalog import DRUG_LIST_PATH, DrugCatalog
+
+MOCK_DATA_DIR = Path(__file__).parent / 'data' / 'mock'
+
+
+def _fingerprint(path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_mock(path):
+    """Parse a mock fixture, treating missing or empty files as no data"""
+    try:
+        text = path.read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+    return json.loads(text) if text else None
+
+
+class DataSnapshot:
+    """Immutable bundle of everything derived from the data files"""
+
+    __slots__ = ('version', 'catalog', 'mock', 'fingerprints', 'changed_drugs', 'loaded_at')
+
+    def __init__(self, version, catalog, mock, fingerprints, changed_drugs, loaded_at):
+        self.version = version
+        self.catalog = catalog
+        self.mock = mock
+        self.fingerprints = fingerprints
+        # Drug names added/modified/removed since the previous version; consumers
+        # such as embedding indexes can rebuild just this delta
+        self.changed_drugs = changed_drugs
+        self.loaded_at = loaded_at
+
+
+def _changed_drugs(old_catalog, new_catalog):
+    if old_catalog is None:
+        return frozenset(record.name for record in new_catalog)
+    old = {record.name: record for record in old_catalog}
+    changed = set()
+    for record in new_catalog:
+        previous = old.pop(record.name, None)
+        if previous is None or previous.to_dict() != record.to_dict():
+            changed.add(record.name)
+    changed.update(old)
+    return frozenset(changed)
+
+
+class SnapshotStore:
+    """Owns the current snapshot and rebuilds it when source files change"""
+
+    def __init__(self, drug_list_path=DRUG_LIST_PATH, mock_dir=MOCK_DATA_DIR, extra_paths=()):
+        self.drug_list_path = Path(drug_list_path)
+        self.mock_dir = Path(mock_dir)
+        # Other derived artifacts whose changes should bump the version
+        self.extra_paths = [Path(path) for path in extra_paths]
+        self._current = None
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_error = None
+
+    @property
+    def current(self):
+        return self._current
+
+    def add_listener(self, callback):
+        """Call ``callback(snapshot)`` after each swap
+
+        A failing listener is recorded in ``reload_errors`` / ``last_error``;
+        it does not undo the swap or stop the other listeners.
+        """
+        self._listeners.append(callback)
+
+    def source_paths(self):
+        return [self.drug_list_path] + sorted(self.mock_dir.glob('*.json')) + self.extra_paths
+
+    def fingerprints(self):
+        return {str(path): _fingerprint(path) for path in self.source_paths()}
+
+    def is_stale(self):
+        snapshot = self._current
+        return snapshot is None or snapshot.fingerprints != self.fingerprints()
+
+    def reload(self, force=False):
+        """Rebuild and swap in a new snapshot; returns it, or None if nothing changed"""
+        with self._lock:
+            previous = self._current
+            fingerprints = self.fingerprints()
+            if not force and previous is not None and previous.fingerprints == fingerprints:
+                return None
+
+            # Build fully before publishing; readers keep the old snapshot meanwhile
+            catalog = DrugCatalog.load(self.drug_list_path)
+            mock = {path.stem: _load_mock(path) for path in sorted(self.mock_dir.glob('*.json'))}
+            snapshot = DataSnapshot(
+                version=(previous.version + 1) if previous else 1,
+                catalog=catalog,
+                mock=mock,
+                fingerprints=fingerprints,
+                changed_drugs=_changed_drugs(previous.catalog if previous else None, catalog),
+                loaded_at=time.time(),
+            )
+            self._current = snapshot
+            self.reloads += 1
+
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                # The snapshot is already live; keep notifying and keep the watcher alive
+                self.reload_errors += 1
+                self.last_error = f"{getattr(callback, '__qualname__', callback)}: {e}"
+        return snapshot
+
+    def try_reload(self):
+        """reload() for background use: keeps serving the old snapshot on failure"""
+        try:
+            return self.reload()
+        except (OSError, ValueError, KeyError) as e:
+            # Typically a file caught mid-write; retried on the next poll
+            self.reload_errors += 1
+            self.last_error = str(e)
+            return None
+
+
+class FileWatcher:
+    """Background thread polling source files and reloading the store on change"""
+
+    def __init__(self, store, interval=2.0):
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='snapshot-watcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.store.is_stale():
+                    continue
+                snapshot = self.store.try_reload()
+            except Exception as e:
+                # Never let an unexpected error end hot reload for the life of the process
+                self.store.reload_errors += 1
+                self.store.last_error = str(e)
+                continue
+            if snapshot:
+                print(f"✓ Data reloaded: version {snapshot.version}, "
+                      f"{len(snapshot.catalog)} drugs, {len(snapshot.changed_drugs)} changed")
+
+
+class VersionedCache:
+    """LRU cache whose entries are only valid for the snapshot version they were built from"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _advance(self, version):
+        """Drop all entries when a newer version is seen; False for stale versions"""
+        if self._version is None or version > self._version:
+            self._entries.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, version, key):
+        with self._lock:
+            if self._advance(version) and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, version, key, value):
+        with self._lock:
+            # A request that started on an older snapshot must not repopulate the cache
+            if not self._advance(version):
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,10 +1,10 @@
 // Real-time pharmaceutical data integration
 // Combines PubChem, PubMed, ClinicalTrials.gov, and OpenFDA APIs
 
-const PUBCHEM_BASE = 'https://pubchem.ncbi.nlm.nih.gov/rest/pug';
-const PUBMED_BASE = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils';
-const CLINICAL_TRIALS_BASE = 'https://clinicaltrials.gov/api/v2';
-const OPENFDA_BASE = 'https://api.fda.gov/drug';
+const PUBCHEM_BASE = import.meta.env.VITE_PUBCHEM_BASE || 'https://pubchem.ncbi.nlm.nih.gov/rest/pug';
+const PUBMED_BASE = import.meta.env.VITE_PUBMED_BASE || 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils';
+const CLINICAL_TRIALS_BASE = import.meta.env.VITE_CLINICAL_TRIALS_BASE || 'https://clinicaltrials.gov/api/v2';
+const OPENFDA_BASE = import.meta.env.VITE_OPENFDA_BASE || 'https://api.fda.gov/drug';
 
 // Cache utilities to prevent rate limiting
 const CACHE_DURATION = 1000 * 60 * 60; // 1 hour
@@ -2,7 +2,7 @@
 // Provides comprehensive drug name search from National Library of Medicine
 // Contains ALL FDA-approved drugs and clinical drugs
 
-const RXNORM_BASE = 'https://rxnav.nlm.nih.gov/REST';
+const RXNORM_BASE = import.meta.env.VITE_RXNORM_BASE || 'https://rxnav.nlm.nih.gov/REST';
 
 // Cache for performance
 const drugNameCache = new Map();
@@ -0,0 +1,98 @@
+"""
+Streaming export encoders (export.py)
+
+Usage:
+    python -m pytest tests/test_export.py -q
+"""
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from export import stream_csv, stream_ndjson, stream_parquet  # noqa: E402
+
+
+def candidates(*rows):
+    return {'results': list(rows)}
+
+
+def read_parquet(chunks):
+    pq = pytest.importorskip('pyarrow.parquet')
+    return pq.read_table(io.BytesIO(b''.join(chunks)))
+
+
+def test_csv_keeps_failed_drugs_and_columns_after_leading_error():
+    results = [
+        ('Bad', {'error': 'boom'}),
+        ('Aspirin', candidates({'disease': 'Colon cancer', 'score': 0.9, 'pathways': ['COX-2', 'NF-kB']})),
+    ]
+    lines = ''.join(stream_csv(iter(results))).splitlines()
+    assert lines == [
+        'drug,rank,error,disease,score,pathways',
+        'Bad,,boom,,,',
+        'Aspirin,1,,Colon cancer,0.9,COX-2; NF-kB',
+    ]
+
+
+def test_csv_columns_always_include_drug_and_error():
+    results = [('Bad', {'error': 'boom'}), ('Aspirin', candidates({'score': 0.9}))]
+    lines = ''.join(stream_csv(iter(results), ['score'])).splitlines()
+    assert lines == ['drug,score,error', 'Bad,,boom', 'Aspirin,0.9,']
+
+
+def test_ndjson_reports_errors_inline():
+    results = [('Bad', {'error': 'boom'}), ('Aspirin', candidates({'score': 0.9}))]
+    rows = [json.loads(line) for line in ''.join(stream_ndjson(iter(results))).splitlines()]
+    assert rows[0] == {'drug': 'Bad', 'error': 'boom'}
+    assert rows[1]['rank'] == 1 and rows[1]['score'] == 0.9
+
+
+def test_parquet_spans_row_groups_when_a_field_starts_null():
+    results = [
+        ('A', candidates({'score': 0.9, 'note': None}, {'score': 0.8, 'note': None})),
+        ('B', candidates({'score': 0.7, 'note': 'strong evidence'}, {'score': 0.6, 'note': 'weak'})),
+    ]
+    table = read_parquet(stream_parquet(iter(results), rows_per_group=2))
+    assert table.num_rows == 4
+    assert table.column('note').to_pylist() == [None, None, 'strong evidence', 'weak']
+    assert table.column('score').to_pylist() == [0.9, 0.8, 0.7, 0.6]
+
+
+def test_parquet_leading_error_group_does_not_drop_candidate_columns():
+    results = [
+        ('Bad', {'error': 'boom'}),
+        ('A', candidates({'disease': 'Glioma', 'score': 0.9})),
+        ('B', candidates({'disease': 'Sepsis', 'score': 0.5})),
+    ]
+    table = read_parquet(stream_parquet(iter(results), rows_per_group=1))
+    assert table.column_names == ['drug', 'rank', 'error', 'disease', 'score', 'extra']
+    assert table.column('error').to_pylist() == ['boom', None, None]
+    assert table.column('disease').to_pylist() == [None, 'Glioma', 'Sepsis']
+
+
+def test_parquet_keeps_later_keys_and_mismatched_values_in_extra():
+    results = [
+        ('A', candidates({'score': 0.9, 'trials': 3})),
+        ('B', candidates({'score': 0.5, 'trials': 'unknown', 'patent': 'expired'})),
+    ]
+    table = read_parquet(stream_parquet(iter(results), rows_per_group=1))
+    assert table.column('trials').to_pylist() == [3, None]
+    extra = table.column('extra').to_pylist()
+    assert extra[0] is None
+    assert json.loads(extra[1]) == {'trials': 'unknown', 'patent': 'expired'}
+
+
+def test_parquet_columns_fix_the_schema():
+    results = [('Bad', {'error': 'boom'}), ('A', candidates({'disease': 'Glioma', 'score': 0.9}))]
+    table = read_parquet(stream_parquet(iter(results), columns=['score'], rows_per_group=1))
+    assert table.column_names == ['drug', 'rank', 'error', 'score']
+    assert table.column('score').to_pylist() == [None, 0.9]
+
+
+def test_parquet_with_only_errors_or_nothing():
+    table = read_parquet(stream_parquet(iter([('Bad', {'error': 'boom'})])))
+    assert table.column('error').to_pylist() == ['boom']
+    assert read_parquet(stream_parquet(iter([]))).num_rows == 0
@@ -0,0 +1,103 @@
+"""
+Ingredient grouping and lookup order of scripts/fetch_side_effects.py
+
+Usage:
+    python -m pytest tests/test_fetch_side_effects.py -q
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pandas')
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'scripts'))
+from catalog import DrugCatalog  # noqa: E402
+from fetch_side_effects import enrich_catalog, group_by_ingredient, lookup_names, normalize_ingredient  # noqa: E402
+
+
+def make_catalog(*drugs):
+    """Unenriched catalog from (name, trade name) pairs"""
+    return DrugCatalog.from_dicts(
+        {
+            'name': name, 'tradeName': trade_name, 'approvedFor': 'Test', 'description': '',
+            'category': 'Diabetes', 'sideEffects': [], 'enriched': False, 'lastUpdated': '',
+        }
+        for name, trade_name in drugs
+    )
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Metformin HCl ER', 'metformin'),
+    ('Losartan Potassium', 'losartan'),
+    ('Diclofenac Sodium XR', 'diclofenac'),
+    ('Calcium Gluconate', 'calcium gluconate'),
+    ('Potassium Gluconate', 'potassium gluconate'),
+    ('Potassium Chloride', 'potassium chloride'),
+    ('Sodium Chloride', 'sodium chloride'),
+    ('Sodium Valproate ER', 'sodium valproate'),
+    ('Co-Trimoxazole', 'co trimoxazole'),
+    ('', ''),
+])
+def test_normalize_ingredient_strips_only_trailing_salts(name, expected):
+    assert normalize_ingredient(name) == expected
+
+
+def test_group_by_ingredient_merges_salts_and_trade_names():
+    catalog = make_catalog(
+        ('Metformin HCl', 'Glucophage'),
+        ('Metformin ER', ''),
+        ('Sirolimus', 'Rapamune'),
+        ('Rapamune', ''),
+        ('Calcium Gluconate', ''),
+        ('Potassium Gluconate', ''),
+    )
+    groups = [[drug.name for drug in group] for group in group_by_ingredient(list(catalog))]
+    assert groups == [
+        ['Metformin HCl', 'Metformin ER'],
+        ['Sirolimus', 'Rapamune'],
+        ['Calcium Gluconate'],
+        ['Potassium Gluconate'],
+    ]
+
+
+def test_lookup_names_tries_core_ingredient_first():
+    group = list(make_catalog(('Metformin HCl', ''), ('Metformin ER', ''), ('Metformin XR', '')))
+    assert lookup_names(group, limit=3) == ['metformin', 'Metformin HCl', 'Metformin ER']
+    assert lookup_names(group, limit=1) == ['metformin']
+
+
+def test_lookup_names_keeps_catalog_spelling_of_core_name():
+    group = list(make_catalog(('Aspirin', ''), ('Aspirin ER', '')))
+    assert lookup_names(group) == ['Aspirin', 'Aspirin ER']
+
+
+def test_enrich_catalog_retries_group_members_before_fallback():
+    catalog = make_catalog(('Metformin HCl', ''), ('Metformin ER', ''), ('Sitagliptin', ''))
+    calls = []
+
+    def fetch(name):
+        calls.append(name)
+        if name == 'Metformin ER':
+            return [{'term': 'NAUSEA', 'count': 40}, {'term': 'DIARRHOEA', 'count': 30}], True
+        return [], True
+
+    stats = enrich_catalog(catalog, fetch=fetch, delay=0, progress=False)
+
+    assert calls == ['metformin', 'Metformin HCl', 'Metformin ER', 'Sitagliptin']
+    assert stats['api_calls'] == 4
+    assert [drug.side_effects for drug in catalog][:2] == [['NAUSEA', 'DIARRHOEA']] * 2
+    assert catalog.get('Sitagliptin').data_source == 'Generic'
+    assert stats['enriched'] == 2 and stats['generic'] == 1
+
+
+def test_enrich_catalog_reports_failed_only_when_every_lookup_errors():
+    catalog = make_catalog(('Metformin HCl', ''), ('Glipizide', ''))
+
+    def fetch(name):
+        return [], name.lower().startswith('metformin')
+
+    stats = enrich_catalog(catalog, fetch=fetch, delay=0, progress=False)
+    assert stats['generic'] == 1 and stats['failed'] == 1